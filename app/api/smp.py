@@ -1,10 +1,20 @@
-from fastapi import APIRouter, FastAPI, HTTPException, UploadFile, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, FastAPI, HTTPException, UploadFile, BackgroundTasks, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from celery.result import AsyncResult
 from app.pipeline.smiles_prediction import predict_smiles
+import json
 import shutil
 import os
+import uuid
+from typing import Optional
 from app.core.logging_config import logger
+from app.utils.file_hash import calculate_file_hash
+from app.utils.progress import iter_progress_events
+from app.utils.upload_lock import acquire_upload_lock, release_upload_lock
+from app.repositories.prediction_results import (
+    get_prediction_result_image,
+    get_prediction_results_page,
+)
 from urllib.parse import quote, unquote
 router = APIRouter()
 
@@ -35,10 +45,25 @@ async def upload_document(file: UploadFile, origin_ext_path: str, origin_dir_pat
         # Handle file save errors gracefully
         raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
 
-    # Start the background task
-    task = predict_smiles.delay(
-        file_location=file_location, origin_ext_path=origin_ext_path
+    # Run identical content at the same path only once: if it is already being
+    # processed, hand back the in-flight task instead of enqueueing new work
+    task_id = str(uuid.uuid4())
+    in_flight_task_id = acquire_upload_lock(
+        calculate_file_hash(file_location), file_location, task_id
     )
+    if in_flight_task_id:
+        logger.info(f"Document is already being processed by task {in_flight_task_id}")
+        return {"task_id": in_flight_task_id, "message": "Document is already being processed."}
+
+    # Start the background task
+    try:
+        task = predict_smiles.apply_async(
+            kwargs={"file_location": file_location, "origin_ext_path": origin_ext_path},
+            task_id=task_id,
+        )
+    except Exception as e:
+        release_upload_lock(task_id)
+        raise HTTPException(status_code=500, detail=f"Error starting task: {str(e)}")
     return {"task_id": task.id, "message": "Document processing started."}
 
 
@@ -47,6 +72,8 @@ async def get_task_status(task_id: str):
     task_result = AsyncResult(task_id)
     if task_result.state == "PENDING":
         return {"status": "Processing", "task_id": task_id}
+    elif task_result.state == "PROGRESS":
+        return {"status": "Processing", "task_id": task_id, "progress": task_result.info}
     elif task_result.state == "SUCCESS":
         return {"status": "Completed", "result": task_result.result}
     elif task_result.state == "FAILURE":
@@ -54,9 +81,60 @@ async def get_task_status(task_id: str):
     return {"status": task_result.state}
 
 
+@router.get("/progress/{task_id}")
+async def stream_task_progress(task_id: str, request: Request):
+    """
+    Stream the progress events of a task as server-sent events.
+
+    The stream ends after the final event, or once the task has finished if
+    its events are no longer available.
+    """
+    async def event_stream():
+        async for event in iter_progress_events(task_id):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                task_result = AsyncResult(task_id)
+                if task_result.ready():
+                    stage = "completed" if task_result.successful() else "failed"
+                    yield f"event: {stage}\ndata: {json.dumps({'task_id': task_id, 'stage': stage})}\n\n"
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/results/{task_id}")
 async def get_task_result(task_id: str):
     task_result = AsyncResult(task_id)
     if task_result.state == "SUCCESS":
         return {"status": "Completed", "result": task_result.result}
     return {"status": "Not available"}
+
+
+@router.get("/documents/{document_id}/results")
+async def get_document_results(
+    request: Request,
+    document_id: uuid.UUID,
+    run_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    page = await get_prediction_results_page(document_id, run_id=run_id, skip=skip, limit=limit)
+    for result in page["results"]:
+        result["image_url"] = str(request.url_for("get_result_image", result_id=str(result["id"])))
+    return {"document_id": document_id, "skip": skip, "limit": limit, **page}
+
+
+@router.get("/results/{result_id}/image", name="get_result_image")
+async def get_result_image(result_id: uuid.UUID):
+    image = await get_prediction_result_image(result_id)
+    if image is None:
+        raise HTTPException(status_code=404, detail="Result image not found")
+    return Response(content=image, media_type="image/png")
@@ -0,0 +1,78 @@
+import os
+from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
+from dotenv import load_dotenv
+from app.core.logging_config import logger
+from app.core.metrics import mark_process_dead, start_worker_exporter
+from app.core.serializer import BINARY_SERIALIZER, CELERY_SERIALIZER, register_binary_serializer
+import redis
+
+# The Celery app shared by the prediction worker (app.core.celery_config),
+# the hooks worker (app.core.celery_hooks) and the API. Nothing here imports
+# TensorFlow or the models.
+
+# Load environment variables from a .env file if present
+load_dotenv()
+
+# Fetch broker and backend URLs
+broker = os.getenv("REDIS_BROKER_URL", "redis://localhost:6379/0")
+backend = os.getenv("REDIS_BACKEND_URL", "redis://localhost:6379/0")
+
+# Validate Redis connection
+try:
+    redis_connection = redis.Redis.from_url(broker)
+    redis_connection.ping()
+    logger.info("Redis broker is reachable.")
+except Exception as e:
+    logger.error(f"Could not connect to Redis broker: {e}")
+    raise ValueError("Invalid Redis configuration or Redis is unreachable.")
+
+# Log broker and backend URLs
+logger.info(f"Broker URL: {broker}")
+logger.info(f"Backend URL: {backend}")
+
+# Queue for the network-bound enrichment and post hooks, consumed by a
+# separate high-concurrency worker (see celery-hooks.sh)
+HOOKS_QUEUE = os.getenv("HOOKS_QUEUE", "hooks")
+
+# Initialize Celery app
+celery_app = Celery(
+    "tasks",
+    broker=broker,
+    backend=backend,
+)
+
+# Register the opt-in binary serializer (see app/core/serializer.py)
+register_binary_serializer()
+logger.info(f"Celery serializer: {CELERY_SERIALIZER}")
+
+# Update Celery configuration
+celery_app.conf.update(
+    task_serializer=CELERY_SERIALIZER,
+    result_serializer=CELERY_SERIALIZER,
+    accept_content=['json', BINARY_SERIALIZER],
+    result_accept_content=['json', BINARY_SERIALIZER],
+    timezone='UTC',
+    enable_utc=True,
+    # Task results are compact summaries; full results live in MongoDB
+    result_expires=int(os.getenv("CELERY_RESULT_EXPIRES", str(24 * 3600))),
+    # Document tasks are acknowledged late, and the Redis broker redelivers
+    # an unacknowledged message after this many seconds even if its task is
+    # still running. Keep it above the longest document run; a copy
+    # redelivered early is dropped by the run lease (app/utils/run_lease.py).
+    broker_transport_options={
+        "visibility_timeout": int(os.getenv("BROKER_VISIBILITY_TIMEOUT", str(12 * 3600))),
+    },
+)
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """Serve the worker's Prometheus metrics (see WORKER_METRICS_PORT)."""
+    start_worker_exporter()
+
+
+@worker_process_shutdown.connect
+def clean_up_child_metrics(pid=None, **kwargs):
+    """Drop the live gauges of an exiting pool child in multiprocess mode."""
+    mark_process_dead(pid or os.getpid())
@@ -1,73 +1,90 @@
 import os
-from celery import Celery
-from dotenv import load_dotenv
-import tensorflow as tf
+from celery.signals import worker_init, worker_process_init
+from app.core.celery_app import HOOKS_QUEUE, backend, broker, celery_app, redis_connection  # noqa: F401
 from app.core.logging_config import logger
-from app.hooks.registry import load_hooks_from_directory
-import redis
+from app.core.model_warmup import warm_up_models
 
-# Load environment variables from a .env file if present
-load_dotenv()
-
-# Fetch broker and backend URLs
-broker = os.getenv("REDIS_BROKER_URL", "redis://localhost:6379/0")
-backend = os.getenv("REDIS_BACKEND_URL", "redis://localhost:6379/0")
-
-# Validate Redis connection
-try:
-    redis_connection = redis.Redis.from_url(broker)
-    redis_connection.ping()
-    logger.info("Redis broker is reachable.")
-except Exception as e:
-    logger.error(f"Could not connect to Redis broker: {e}")
-    raise ValueError("Invalid Redis configuration or Redis is unreachable.")
-
-# Log broker and backend URLs
-logger.info(f"Broker URL: {broker}")
-logger.info(f"Backend URL: {backend}")
+# Celery app of the prediction worker (see celery.sh): the shared app from
+# app.core.celery_app, plus the TensorFlow set-up and model warm-up.
 
 # TensorFlow configuration
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppress TensorFlow logs
 os.environ['TF_FORCE_GPU_ALLOW_GROWTH'] = 'true'
-tf.config.set_soft_device_placement(True)
-
-# Log TensorFlow GPU availability
-gpus = tf.config.list_physical_devices('GPU')
-if gpus:
-    logger.info(f"Available GPUs: {[gpu.name for gpu in gpus]}")
-else:
-    logger.warning("No GPUs detected. TensorFlow will use CPU.")
-
-# Initialize Celery app
-celery_app = Celery(
-    "tasks",
-    broker=broker,
-    backend=backend,
-)
 
-# Update Celery configuration
+# Split the cores between the worker's pool processes so that N prefork
+# children do not each start a thread per core
+worker_concurrency = int(os.getenv("WORKER_CONCURRENCY", "1"))
+threads_per_process = max((os.cpu_count() or 1) // max(worker_concurrency, 1), 1)
+
+
+def configure_tensorflow():
+    """
+    Import and configure TensorFlow in the process that will run the models,
+    and log GPU availability.
+
+    The prediction worker's main module does not import TensorFlow or the
+    models, so a prefork parent forks its children without a TensorFlow
+    runtime (which is not fork-safe) and each child loads its own.
+    """
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(
+        int(os.getenv("TF_INTRA_OP_THREADS", threads_per_process))
+    )
+    tf.config.threading.set_inter_op_parallelism_threads(
+        int(os.getenv("TF_INTER_OP_THREADS", min(threads_per_process, 2)))
+    )
+    tf.config.set_soft_device_placement(True)
+
+    gpus = tf.config.list_physical_devices('GPU')
+    if gpus:
+        logger.info(f"Available GPUs: {[gpu.name for gpu in gpus]}")
+    else:
+        logger.warning("No GPUs detected. TensorFlow will use CPU.")
+
+
+# Settings of the prediction worker
 celery_app.conf.update(
-    task_serializer='json',
-    result_serializer='json',
-    accept_content=['json'],
-    timezone='UTC',
-    enable_utc=True,
+    worker_concurrency=worker_concurrency,
+    # Each child takes one document at a time; prefetching would queue
+    # documents behind a long-running one
+    worker_prefetch_multiplier=1,
+    # Prefork children load and warm up the models in worker_process_init,
+    # which takes far longer than Celery's default of 4 seconds before it
+    # considers a starting child dead
+    worker_proc_alive_timeout=float(os.getenv("WORKER_PROC_ALIVE_TIMEOUT", "600")),
 )
 
 # Autodiscover tasks
 try:
-    celery_app.autodiscover_tasks(['app.pipeline.smiles_prediction'])
+    celery_app.autodiscover_tasks(['app.pipeline.smiles_prediction', 'app.pipeline.hooks'])
     logger.info("Tasks discovered successfully.")
 except Exception as e:
     logger.error(f"Error discovering tasks: {e}")
     raise
 
-# Load hooks for Celery workers
-hooks_directory = os.path.join(os.path.dirname(__file__), "..", "hooks")
-try:
-    logger.info("Loading hooks for Celery workers...")
-    load_hooks_from_directory(hooks_directory)
-    logger.info("Hooks loaded successfully.")
-except Exception as e:
-    logger.error(f"Error loading hooks: {e}")
-    raise
+
+# Preload and warm up models before a worker accepts tasks
+MODEL_WARMUP_ENABLED = os.getenv("MODEL_WARMUP_ENABLED", "True").lower() == "true"
+
+
+@worker_process_init.connect
+def warm_up_pool_process(**kwargs):
+    """Load and warm up models in each pool child before it starts consuming tasks."""
+    configure_tensorflow()
+    if MODEL_WARMUP_ENABLED:
+        warm_up_models()
+
+
+@worker_init.connect
+def warm_up_inline_worker(sender=None, **kwargs):
+    """
+    Warm up models in the worker process itself for pools that run tasks
+    inline (solo, threads), where no pool child is started. A prefork parent
+    neither imports TensorFlow nor loads the models.
+    """
+    pool_name = str(getattr(sender, "pool_cls", "")).lower()
+    if "solo" in pool_name or "thread" in pool_name:
+        configure_tensorflow()
+        if MODEL_WARMUP_ENABLED:
+            warm_up_models()
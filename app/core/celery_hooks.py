@@ -0,0 +1,44 @@
+import os
+from celery.signals import worker_init
+from app.core.celery_app import celery_app
+from app.core.logging_config import logger
+from app.hooks.registry import has_async_hooks, load_hooks_from_directory
+
+# Celery app of the hooks worker (see celery-hooks.sh). It only registers the
+# hooks task, so the worker never imports TensorFlow or loads the models.
+
+# Autodiscover tasks
+try:
+    celery_app.autodiscover_tasks(['app.pipeline.hooks'])
+    logger.info("Tasks discovered successfully.")
+except Exception as e:
+    logger.error(f"Error discovering tasks: {e}")
+    raise
+
+# Load hooks for the hooks worker
+hooks_directory = os.path.join(os.path.dirname(__file__), "..", "hooks")
+try:
+    logger.info("Loading hooks for Celery workers...")
+    load_hooks_from_directory(hooks_directory)
+    logger.info("Hooks loaded successfully.")
+except Exception as e:
+    logger.error(f"Error loading hooks: {e}")
+    raise
+
+
+@worker_init.connect
+def check_pool_supports_async_hooks(sender=None, **kwargs):
+    """
+    Refuse to start a gevent or eventlet worker when async hooks are
+    registered. Each execution runs its async hooks with `asyncio.run`, and
+    all greenlets share one thread, so a second document's hooks would find
+    the first one's loop running and fail. Use the threads pool instead.
+    """
+    pool_name = str(getattr(sender, "pool_cls", "")).lower()
+    if ("gevent" in pool_name or "eventlet" in pool_name) and has_async_hooks():
+        logger.error(
+            "Async hooks are registered, but they cannot run in a gevent or eventlet "
+            "pool. Start the hooks worker with HOOKS_POOL=threads."
+        )
+        # Celery logs and ignores exceptions raised by signal handlers
+        raise SystemExit(1)
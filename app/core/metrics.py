@@ -0,0 +1,185 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterable
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from app.core.logging_config import logger
+
+# Prefork workers and multi-process API servers write their samples to
+# PROMETHEUS_MULTIPROC_DIR, and the exporters aggregate them at scrape time
+MULTIPROCESS_MODE = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# Port of the worker-side exporter (0 disables it)
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9808"))
+
+# Pipeline stages take from milliseconds (cache hits) to minutes (long hooks)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Worker metrics
+model_warmup_seconds = Gauge(
+    "decimer_model_warmup_seconds",
+    "Time taken to load and warm up the segmentation and DECIMER models",
+    multiprocess_mode="max",
+)
+stage_seconds = Histogram(
+    "decimer_stage_seconds",
+    "Time spent in each pipeline stage (rasterize is per page)",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+hook_seconds = Histogram(
+    "decimer_hook_seconds",
+    "Time spent in each enrichment or post hook",
+    ["pipeline", "hook"],
+    buckets=STAGE_BUCKETS,
+)
+hook_failures_total = Counter(
+    "decimer_hook_failures_total",
+    "Hooks that raised an exception",
+    ["pipeline", "hook"],
+)
+pages_total = Counter(
+    "decimer_pages_total",
+    "Pages processed, by outcome of the page pre-filter",
+    ["outcome"],
+)
+page_cache_total = Counter(
+    "decimer_page_cache_total",
+    "Rendered page cache lookups",
+    ["result"],
+)
+segments_total = Counter(
+    "decimer_segments_total",
+    "Chemical structure segments found",
+)
+predictions_total = Counter(
+    "decimer_predictions_total",
+    "SMILES predictions, by where they came from",
+    ["source"],
+)
+daikon_requests_total = Counter(
+    "decimer_daikon_requests_total",
+    "Requests to the Daikon APIs",
+    ["operation", "outcome"],
+)
+daikon_cache_total = Counter(
+    "decimer_daikon_cache_total",
+    "Daikon response cache lookups",
+    ["operation", "result"],
+)
+daikon_request_seconds = Histogram(
+    "decimer_daikon_request_seconds",
+    "Latency of requests to the Daikon APIs",
+    ["operation"],
+    buckets=STAGE_BUCKETS,
+)
+
+http_client_requests_total = Counter(
+    "decimer_http_client_requests_total",
+    "Outbound HTTP request attempts, by outcome",
+    ["host", "method", "outcome"],
+)
+http_client_request_seconds = Histogram(
+    "decimer_http_client_request_seconds",
+    "Latency of outbound HTTP request attempts",
+    ["host", "method"],
+    buckets=STAGE_BUCKETS,
+)
+http_circuit_open = Gauge(
+    "decimer_http_circuit_open",
+    "Whether the circuit breaker of an upstream host is open",
+    ["host"],
+    multiprocess_mode="max",
+)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Observe the duration of the enclosed block as a pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.labels(stage=stage).observe(time.perf_counter() - start)
+
+
+class QueueDepthCollector:
+    """Report the number of messages waiting in each Celery queue at scrape time."""
+
+    def __init__(self, redis_connection, queues: Iterable[str]):
+        self.redis_connection = redis_connection
+        self.queues = list(queues)
+
+    def collect(self):
+        gauge = GaugeMetricFamily(
+            "decimer_queue_depth", "Messages waiting in each Celery queue", labels=["queue"]
+        )
+        for queue in self.queues:
+            try:
+                gauge.add_metric([queue], self.redis_connection.llen(queue))
+            except Exception as e:
+                logger.warning(f"Could not read the length of queue '{queue}': {str(e)}")
+        yield gauge
+
+
+# Collectors computed at scrape time, such as the queue depths
+_scrape_collectors = []
+
+
+def _multiprocess_registry() -> CollectorRegistry:
+    """Return a registry aggregating the samples written by every process."""
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def register_queue_depth_collector(redis_connection, queues: Iterable[str]):
+    """Expose the depth of the given Celery queues."""
+    collector = QueueDepthCollector(redis_connection, queues)
+    _scrape_collectors.append(collector)
+    if not MULTIPROCESS_MODE:
+        REGISTRY.register(collector)
+
+
+def render_metrics() -> bytes:
+    """Render all metrics in the Prometheus text format."""
+    if not MULTIPROCESS_MODE:
+        return generate_latest(REGISTRY)
+    registry = _multiprocess_registry()
+    for collector in _scrape_collectors:
+        registry.register(collector)
+    return generate_latest(registry)
+
+
+def mark_process_dead(pid: int):
+    """Drop the live gauges of a pool child that exited, in multiprocess mode."""
+    if MULTIPROCESS_MODE:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
+
+
+def start_worker_exporter(port: int = WORKER_METRICS_PORT):
+    """
+    Serve the metrics of this worker, and of its pool children in
+    multiprocess mode, over HTTP.
+    """
+    if not port:
+        return
+    registry = _multiprocess_registry() if MULTIPROCESS_MODE else REGISTRY
+    try:
+        start_http_server(port, registry=registry)
+        logger.info(f"Serving worker metrics on port {port}")
+    except OSError as e:
+        logger.warning(f"Could not start the worker metrics exporter on port {port}: {str(e)}")
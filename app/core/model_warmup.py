@@ -0,0 +1,46 @@
+import os
+import time
+import numpy as np
+from app.core.logging_config import logger
+from app.core.metrics import model_warmup_seconds
+
+# Models are warmed up once per process; the PID guards against a flag
+# inherited through fork
+_warmed_up_pid = None
+
+
+def warm_up_models() -> float:
+    """
+    Load the segmentation and DECIMER models and run them once on a dummy page.
+
+    Importing the services loads the model weights, and the dummy inference
+    triggers TensorFlow graph tracing, so the first real task does not pay for
+    either.
+
+    Returns:
+        float: The warm-up time in seconds (0 if already warmed up).
+    """
+    global _warmed_up_pid
+    if _warmed_up_pid == os.getpid():
+        return 0.0
+
+    logger.info("[START] Warming up models")
+    start = time.perf_counter()
+
+    from app.service.segmentation.segment import segment_images
+    from app.service.prediction.predict_smiles import predict_smiles_from_segments
+
+    page = np.full((1024, 768, 3), 255, dtype=np.uint8)
+    segment_images(page)
+
+    # A few strokes so the decoder runs for more than one step
+    segment = np.full((300, 300, 3), 255, dtype=np.uint8)
+    segment[100:104, 50:250] = 0
+    segment[196:200, 50:250] = 0
+    predict_smiles_from_segments([segment], use_cache=False)
+
+    elapsed = time.perf_counter() - start
+    model_warmup_seconds.set(elapsed)
+    _warmed_up_pid = os.getpid()
+    logger.info(f"[END] Warming up models ({elapsed:.1f}s)")
+    return elapsed
@@ -0,0 +1,76 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+import msgpack
+import numpy as np
+from kombu.serialization import register
+
+# Opt-in binary serializer for task messages and results. JSON stays the
+# default; set CELERY_SERIALIZER=decimer-msgpack on every producer and worker
+# to switch. Both formats are always accepted so that a mixed deployment keeps
+# working while it is being rolled over.
+BINARY_SERIALIZER = "decimer-msgpack"
+BINARY_CONTENT_TYPE = "application/x-decimer-msgpack"
+CELERY_SERIALIZER = os.getenv("CELERY_SERIALIZER", "json")
+
+# msgpack extension type codes
+_EXT_NDARRAY = 1
+_EXT_UUID = 2
+_EXT_DATETIME = 3
+
+
+def _encode_extension(obj):
+    """Encode the types msgpack does not support natively."""
+    if isinstance(obj, np.ndarray):
+        array = np.ascontiguousarray(obj)
+        data = msgpack.packb([array.dtype.str, list(array.shape), array.tobytes()])
+        return msgpack.ExtType(_EXT_NDARRAY, data)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, obj.bytes)
+    if isinstance(obj, datetime):
+        offset = obj.utcoffset()
+        data = msgpack.packb([
+            obj.year, obj.month, obj.day, obj.hour, obj.minute, obj.second,
+            obj.microsecond, None if offset is None else int(offset.total_seconds()),
+        ])
+        return msgpack.ExtType(_EXT_DATETIME, data)
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def _decode_extension(code: int, data: bytes):
+    """Decode the extension types written by `_encode_extension`."""
+    if code == _EXT_NDARRAY:
+        dtype, shape, buffer = msgpack.unpackb(data)
+        return np.frombuffer(buffer, dtype=np.dtype(dtype)).reshape(shape).copy()
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_DATETIME:
+        *fields, offset = msgpack.unpackb(data)
+        tzinfo = None if offset is None else timezone(timedelta(seconds=offset))
+        return datetime(*fields, tzinfo=tzinfo)
+    return msgpack.ExtType(code, data)
+
+
+def dumps(obj) -> bytes:
+    """Serialize a task message or result to msgpack."""
+    return msgpack.packb(obj, default=_encode_extension, use_bin_type=True)
+
+
+def loads(data: bytes):
+    """Deserialize a task message or result from msgpack."""
+    return msgpack.unpackb(
+        data, ext_hook=_decode_extension, raw=False, strict_map_key=False
+    )
+
+
+def register_binary_serializer():
+    """Register the binary serializer with kombu under `BINARY_SERIALIZER`."""
+    register(
+        BINARY_SERIALIZER,
+        dumps,
+        loads,
+        content_type=BINARY_CONTENT_TYPE,
+        content_encoding="binary",
+    )
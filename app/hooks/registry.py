@@ -1,7 +1,12 @@
+import asyncio
+import functools
 import importlib.util
+import inspect
 import os
+import time
 from typing import Dict, List, Callable
 from app.core.logging_config import logger
+from app.core.metrics import hook_failures_total, hook_seconds
 
 # Dictionary to maintain pipeline-specific hooks
 pipeline_hooks: Dict[str, List[Callable]] = {}
@@ -10,6 +15,11 @@ pipeline_hooks: Dict[str, List[Callable]] = {}
 def register_hook(pipeline: str, hook: Callable):
     """
     Register a callable hook for a specific pipeline.
+
+    A hook may be an `async def` function. Async hooks that are adjacent in
+    the (alphabetical) hook order are awaited concurrently; a sync hook waits
+    for the hooks before it and runs alone, so hooks that depend on each
+    other's results should be kept apart by name or stay sync.
     """
     if not callable(hook):
         raise ValueError("Hook must be callable.")
@@ -21,19 +31,106 @@ def register_hook(pipeline: str, hook: Callable):
     logger.info(f"Hook registered for pipeline '{pipeline}': {hook.__name__}")
 
 
+def _hook_batches(hooks: List[Callable]) -> List[List[Callable]]:
+    """Split the hooks into runs of adjacent async hooks and single sync hooks."""
+    batches = []
+    for hook in hooks:
+        if (
+            inspect.iscoroutinefunction(hook)
+            and batches
+            and inspect.iscoroutinefunction(batches[-1][0])
+        ):
+            batches[-1].append(hook)
+        else:
+            batches.append([hook])
+    return batches
+
+
+def _hook_failed(pipeline: str, hook: Callable, error: Exception):
+    hook_failures_total.labels(pipeline=pipeline, hook=hook.__name__).inc()
+    logger.error(f"Error executing hook '{hook.__name__}' in pipeline '{pipeline}': {error}")
+
+
+def _run_hook(pipeline: str, hook: Callable, document, results):
+    start = time.perf_counter()
+    try:
+        logger.info(f"Executing hook for pipeline '{pipeline}': {hook.__name__}")
+        hook(document=document, results=results)
+    except Exception as e:
+        _hook_failed(pipeline, hook, e)
+    finally:
+        hook_seconds.labels(pipeline=pipeline, hook=hook.__name__).observe(
+            time.perf_counter() - start
+        )
+
+
+async def _await_hook(pipeline: str, hook: Callable, document, results):
+    start = time.perf_counter()
+    try:
+        logger.info(f"Executing async hook for pipeline '{pipeline}': {hook.__name__}")
+        await hook(document=document, results=results)
+    except Exception as e:
+        _hook_failed(pipeline, hook, e)
+    finally:
+        hook_seconds.labels(pipeline=pipeline, hook=hook.__name__).observe(
+            time.perf_counter() - start
+        )
+
+
+async def execute_hooks_async(pipeline: str, document, results):
+    """
+    Execute all hooks for the specified pipeline from an event loop.
+
+    Adjacent async hooks are awaited concurrently; sync hooks run one at a
+    time in the default executor, so they do not block the loop.
+    """
+    loop = asyncio.get_running_loop()
+    for batch in _hook_batches(pipeline_hooks.get(pipeline, [])):
+        if inspect.iscoroutinefunction(batch[0]):
+            await asyncio.gather(
+                *(_await_hook(pipeline, hook, document, results) for hook in batch)
+            )
+        else:
+            await loop.run_in_executor(
+                None, functools.partial(_run_hook, pipeline, batch[0], document, results)
+            )
+
+
+async def _execute_hooks_on_new_loop(pipeline: str, document, results):
+    # Imported here so that pipelines without async hooks do not need httpx
+    from app.utils.daikon_api_async import close_connections
+
+    try:
+        await execute_hooks_async(pipeline, document, results)
+    finally:
+        await close_connections()
+
+
+def has_async_hooks() -> bool:
+    """Return whether any registered hook is an `async def` function."""
+    return any(
+        inspect.iscoroutinefunction(hook)
+        for hooks in pipeline_hooks.values()
+        for hook in hooks
+    )
+
+
 def execute_hooks(pipeline: str, document, results):
     """
     Execute all hooks for the specified pipeline with the provided data.
+
+    Async hooks are run on an event loop created for this call; when the
+    pipeline has none, the hooks simply run in order. The loop is started
+    with `asyncio.run`, which fails in a gevent or eventlet pool as soon as
+    two tasks overlap, so the hooks worker refuses to start in such a pool
+    when async hooks are registered (see app.core.celery_hooks).
     """
     hooks = pipeline_hooks.get(pipeline, [])
+    if any(inspect.iscoroutinefunction(hook) for hook in hooks):
+        asyncio.run(_execute_hooks_on_new_loop(pipeline, document, results))
+        return
     for hook in hooks:
-        try:
-            logger.info(f"Executing hook for pipeline '{pipeline}': {hook.__name__}")
-            hook(document=document, results=results)
-        except Exception as e:
-            logger.error(
-                f"Error executing hook '{hook.__name__}' in pipeline '{pipeline}': {e}"
-            )
+        _run_hook(pipeline, hook, document, results)
 
 
 def load_hooks_from_directory(base_path: str):
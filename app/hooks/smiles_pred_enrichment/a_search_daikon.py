@@ -1,23 +1,32 @@
 from app.core.logging_config import logger
-from app.utils.daikon_api import get_molecule_by_smiles
+from app.utils.daikon_api import get_molecules_by_smiles
 
 def a_search_daikon(document, results):
     """
     Example hook for processing data in Pipeline 1.
+
+    Each distinct SMILES string is looked up once, concurrently, and the
+    answer is mapped back to every result that predicted it.
     """
     try:
         logger.info("[START HOOK] Daikon Molecule DB search")
+        daikon_responses = get_molecules_by_smiles(
+            [result.predicted_smiles for result in results]
+        )
+        logger.info(
+            f"Looked up {len(daikon_responses)} distinct SMILES for {len(results)} results"
+        )
         for result in results:
-            #logger.info(f"RESULT = {result}")
-            #result.print_result()
-            # Implement the Daikon API call here
-            daikon_response = get_molecule_by_smiles(result.predicted_smiles)
+            daikon_response = daikon_responses.get(result.predicted_smiles)
             if daikon_response:
                 result.daikon_molecule_id = daikon_response[0]["id"]
                 result.daikon_molecule_name = daikon_response[0]["name"]
-                document.daikon_molecule_ids.append(result.daikon_molecule_id)
-                document.molecule_tags.append(result.daikon_molecule_name)
-                document.tags.append(result.daikon_molecule_name)
+                if result.daikon_molecule_id not in document.daikon_molecule_ids:
+                    document.daikon_molecule_ids.append(result.daikon_molecule_id)
+                if result.daikon_molecule_name not in document.molecule_tags:
+                    document.molecule_tags.append(result.daikon_molecule_name)
+                if result.daikon_molecule_name not in document.tags:
+                    document.tags.append(result.daikon_molecule_name)
                 result.add_history(
                     "Daikon Search",
                     "Success",
@@ -35,6 +44,6 @@ def a_search_daikon(document, results):
         return None
     finally:
         logger.info("[END HOOK] Daikon Molecule DB search end.")
-        
+
 
 hooks = [a_search_daikon]
@@ -2,33 +2,48 @@ from app.core.logging_config import logger
 from app.utils.daikon_api import (
     get_horizon_associations,
     get_horizon_target,
-    get_molecule_by_smiles,
+    resolve_concurrently,
 )
 
 
 def b_horizon_tagging(document, results):
     """
     Example hook for processing data in Pipeline 1.
+
+    Distinct molecule IDs, and then distinct relation IDs, are resolved
+    concurrently, and the node and target names are added as document tags.
     """
     try:
         logger.info("[START HOOK] Daikon Horizon search")
-        for molId in document.daikon_molecule_ids:
+        associations = resolve_concurrently(
+            get_horizon_associations, document.daikon_molecule_ids
+        )
+
+        tags = set()
+        relation_ids = []
+        for molId, mol_res in associations.items():
             logger.info(f"Molecule ID = {molId}")
-            # Implement the Daikon API call here
-            mol_res = get_horizon_associations(molId)
-            if mol_res:
-                for r in mol_res:
-                    rel_id = r.get("id")
-                    nm = r.get("nodeName")
-                    document.tags.append(nm)
+            for r in mol_res or []:
+                nm = r.get("nodeName")
+                if nm:
+                    tags.add(nm)
                     logger.info(f"Horizon node result = {nm}")
+                relation_ids.append(r.get("id"))
+
+        # Also tag the targets
+        targets = resolve_concurrently(get_horizon_target, relation_ids)
+        for target_res in targets.values():
+            if target_res:
+                target_nm = target_res.get("name")
+                if target_nm:
+                    tags.add(target_nm)
+                    logger.info(f"Horizon target result = {target_nm}")
 
-                    # Also tag the target
-                    target_res = get_horizon_target(rel_id)
-                    if target_res:
-                        target_nm = target_res.get("name")
-                        document.tags.append(target_nm)
-                        logger.info(f"Horizon target result = {target_nm}")
+        logger.info(
+            f"Resolved {len(associations)} molecule(s) and {len(targets)} relation(s) "
+            f"into {len(tags)} tag(s)"
+        )
+        document.tags.extend(sorted(tags - set(document.tags)))
 
     except Exception as e:
         logger.error(f"An error occurred during Daikon search: {str(e)}")
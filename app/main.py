@@ -1,9 +1,13 @@
 from contextlib import asynccontextmanager
 import os
 from fastapi import FastAPI
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from app.api import smp
+from app.core.celery_app import HOOKS_QUEUE, redis_connection
+from app.core.metrics import register_queue_depth_collector, render_metrics
 from app.core.logging_config import logger
 from app.hooks.registry import load_hooks_from_directory
 
@@ -43,3 +47,13 @@ app.add_middleware(
 
 
 app.include_router(smp.router, prefix="/smiles-pred", tags=["smp"])
+
+# Report the backlog of the prediction and hooks queues at scrape time
+register_queue_depth_collector(
+    redis_connection, os.getenv("CELERY_QUEUES", "celery").split(",") + [HOOKS_QUEUE]
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
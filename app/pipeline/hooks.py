@@ -0,0 +1,67 @@
+import os
+from typing import List, Optional
+from app.core.celery_app import HOOKS_QUEUE, celery_app
+from app.core.logging_config import logger
+from app.hooks.registry import execute_hooks
+from app.schema.inputs.document import Document
+from app.schema.results.prediction_result import PredictionResult
+from app.utils.progress import ProgressReporter
+
+
+@celery_app.task(bind=True, queue=HOOKS_QUEUE)
+def run_hooks(
+    self,
+    pipelines: List[str],
+    document_data: dict,
+    results_data: List[dict],
+    progress_task_id: Optional[str] = None,
+):
+    """
+    Execute hook pipelines for a processed document, in order.
+
+    Runs on the hooks queue, whose workers use an I/O-friendly pool (gevent or
+    threads), so the prediction worker never waits on the network.
+    """
+    document = Document(**document_data)
+    results = [PredictionResult.from_json_serializable(data) for data in results_data]
+    for pipeline in pipelines:
+        logger.info(f"[START] Executing {pipeline} hooks for {document.file_path}")
+        execute_hooks(pipeline=pipeline, document=document, results=results)
+        logger.info(f"[END] Executing {pipeline} hooks")
+    ProgressReporter(task_id=progress_task_id).report("hooks_completed", pipelines=pipelines)
+
+
+def dispatch_hooks(
+    document: Document,
+    results: List[PredictionResult],
+    progress_task_id: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Queue the enrichment and post hooks configured in the environment.
+
+    Segment images are left out of the payload, since no hook needs them.
+    When `progress_task_id` is given, a `hooks_completed` progress event is
+    published under that task id once the hooks have run.
+
+    Returns:
+        Optional[str]: The id of the hooks task, or None if no hooks are configured.
+    """
+    pipelines = [
+        pipeline
+        for pipeline in (os.getenv("SMILES_PRED_ENRICH"), os.getenv("SMILES_PRED_POST"))
+        if pipeline is not None
+    ]
+    if not pipelines:
+        return None
+
+    results_data = []
+    for res in results:
+        data = res.json_serializable()
+        data["segmented_image"] = None
+        results_data.append(data)
+
+    task = run_hooks.delay(
+        pipelines, document.json_serializable(), results_data, progress_task_id
+    )
+    logger.info(f"Queued {', '.join(pipelines)} hooks as task {task.id} on '{HOOKS_QUEUE}'")
+    return task.id
@@ -1,34 +1,471 @@
-from app.core.celery_config import celery_app
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from celery import chord, group
+from celery.exceptions import Ignore
+from app.core.celery_app import celery_app
+from app.core.metrics import pages_total, segments_total, time_stage
 import uuid
+import pytz
 from app.core.mongo_config import get_sync_collection
-from app.hooks.registry import execute_hooks
+from app.pipeline.hooks import dispatch_hooks
 from app.schema.inputs.document import Document
 from app.schema.results.prediction_result import PredictionResult
 from app.repositories.document_sync import (
+    checkpoint_document_pages_sync,
     get_document_by_file_path_sync,
+    get_document_by_hash_sync,
+    get_document_run_sync,
     save_document_sync,
+    set_document_status_sync,
 )
 from app.repositories.prediction_results import (
+    delete_uncheckpointed_results_sync,
     get_latest_prediction_results_sync,
+    get_run_prediction_results_sync,
     save_prediction_results_sync,
 )
-from app.service.doc_loader.pdf_loader import pdf_to_images
-from app.service.segmentation.segment import segment_images
-from app.service.prediction.predict_smiles import predict_smiles_from_segment
+from app.service.doc_loader.pdf_loader import (
+    PDF_DPI,
+    PDF_SEGMENT_DPI,
+    get_page_count,
+    iter_pdf_pages,
+)
+from app.service.segmentation.cluster import cluster_segments
+from app.service.segmentation.page_filter import page_may_contain_structures
+from app.service.prediction.prediction_cache import get_cache_stats
 from app.utils.daikon_api import get_molecule_by_smiles
 from app.utils.file_hash import calculate_file_hash
+from app.utils.page_hash import calculate_page_hashes
+from app.utils.progress import ProgressReporter
+from app.utils.run_lease import acquire_run_lease, release_run_lease
+from app.utils.upload_lock import release_lock_after_task  # noqa: F401 (registers the signal)
 from app.service.doc_loader.utils import get_file_type
 from app.core.logging_config import logger
 import os
 
+# The segmentation and DECIMER services are imported where they are used:
+# importing them loads the model weights, which must happen in the process
+# that runs the task (a prefork child), not in the prefork parent or the API
+# that only sends tasks.
 
-@celery_app.task(bind=True)
+# Documents with more pages than this are split into page-range subtasks that
+# run on any available worker (0 disables fan-out)
+PAGE_FANOUT_SIZE = int(os.getenv("PAGE_FANOUT_SIZE", "0"))
+
+# Runs in these states were interrupted and are resumed by the next task for
+# the same content
+UNFINISHED_STATUSES = ("processing", "failed")
+
+
+# Results are saved and the document run checkpointed after every this many
+# pages, so an interrupted run resumes from there and partial results can be
+# queried while the document is processed. Near-duplicate grouping spans
+# the pages saved together, so small values trade deduplication for
+# finer-grained resumption.
+CHECKPOINT_PAGES = max(int(os.getenv("CHECKPOINT_PAGES", "10")), 1)
+
+
+def predict_segment_results(
+    document: Document,
+    segmented_images: List[PredictionResult],
+    progress: ProgressReporter,
+) -> List[PredictionResult]:
+    """
+    Group near-duplicate segments and predict a SMILES string for each group.
+
+    Predicted SMILES strings are recorded on `document`.
+
+    Args:
+        document (Document): The document being processed.
+        segmented_images (List[PredictionResult]): One result per segment,
+            with its segmented image.
+        progress (ProgressReporter): Receives per-batch progress events.
+
+    Returns:
+        List[PredictionResult]: The results, with predictions.
+    """
+    from app.service.prediction.predict_smiles import predict_smiles_from_segments
+
+    results = []
+
+    # Step 3: Group near-duplicate segments so each drawing is predicted once
+    logger.info("[START] Grouping near-duplicate segments")
+    with time_stage("cluster"):
+        assignment = cluster_segments(
+            [result.segmented_image for result in segmented_images]
+        )
+    representatives = sorted(set(assignment))
+    group_ids = {rep: group for group, rep in enumerate(representatives)}
+    group_sizes = {rep: assignment.count(rep) for rep in representatives}
+    for index, result in enumerate(segmented_images):
+        rep = assignment[index]
+        if group_sizes[rep] == 1:
+            continue
+        if rep == index:
+            details = f"Representative of group {group_ids[rep]} ({group_sizes[rep]} members)"
+        else:
+            details = (
+                f"Member of group {group_ids[rep]}; prediction copied from "
+                f"the representative on page {segmented_images[rep].page}"
+            )
+        result.add_history("Deduplication", "Success", details)
+    logger.info(
+        f"[END] Grouping near-duplicate segments ({len(segmented_images)} segments, "
+        f"{len(representatives)} unique)"
+    )
+
+    # Step 4: Predict SMILES strings
+    logger.info("[START] Predicting SMILES strings")
+    with time_stage("predict"):
+        rep_predictions = predict_smiles_from_segments(
+            [segmented_images[rep].segmented_image for rep in representatives],
+            on_progress=lambda done, total: progress.report(
+                "predicted", unique_segments_predicted=done, unique_segments=total
+            ),
+        )
+    predictions = [rep_predictions[group_ids[rep]] for rep in assignment]
+    for result, prediction in zip(segmented_images, predictions):
+        smiles, confidence = prediction or (None, None)
+        if smiles:
+            result.predicted_smiles = smiles
+            result.confidence = confidence
+            result.add_history(
+                "SMILES Prediction",
+                "Success" if confidence >= 0.5 else "Low confidence",
+                f"Predicted SMILES: {smiles} with confidence {confidence}",
+            )
+            document.predicted_smiles_list.append(smiles)
+        else:
+            result.add_history(
+                "SMILES Prediction", "Failed", "Failed to predict SMILES string"
+            )
+        result.run_id = document.run_id
+        results.append(result)
+    logger.info(f"Prediction cache stats: {get_cache_stats()}")
+    logger.info("[END] Predicting SMILES strings")
+
+    return results
+
+
+def save_pages(
+    document: Document,
+    pages: List[int],
+    skipped_pages: List[int],
+    results: List[PredictionResult],
+    progress: Optional[ProgressReporter] = None,
+):
+    """
+    Save the results of finished pages and checkpoint them on the document run.
+
+    Results are written before the checkpoint; results of pages that were
+    never checkpointed are deleted when the run resumes.
+    """
+    if not pages:
+        return
+    with time_stage("mongo_save"):
+        save_prediction_results_sync(results)
+        checkpoint_document_pages_sync(document.id, document.run_id, pages, skipped_pages)
+    logger.info(f"[CHECKPOINT] Saved {len(results)} result(s) for page(s) {pages}")
+    if progress is not None:
+        progress.report(
+            "saved", pages=pages, results=[res.summary() for res in results]
+        )
+
+
+def process_pages(
+    document: Document,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+    pages: Optional[List[int]] = None,
+    progress: Optional[ProgressReporter] = None,
+) -> int:
+    """
+    Rasterize, segment and predict a page range of a document, saving the
+    results every `CHECKPOINT_PAGES` pages.
+
+    Skipped pages and predicted SMILES strings are recorded on `document`.
+
+    Args:
+        document (Document): The document being processed. Its run must
+            already be saved.
+        first_page (int, optional): First page to process (1-based, inclusive).
+        last_page (int, optional): Last page to process (1-based, inclusive).
+        pages (List[int], optional): Process only these pages (1-based).
+        progress (ProgressReporter, optional): Receives per-page and
+            per-batch progress events.
+
+    Returns:
+        int: The number of results saved.
+
+    Raises:
+        RuntimeError: If any page could not be rendered, after the other
+            pages have been saved.
+    """
+    from app.service.segmentation.segment import segment_images, segment_images_rerendered
+
+    file_location = document.file_path
+    progress = progress or ProgressReporter()
+    saved_count = 0
+
+    # Step 2: Segment the chemical structures, streaming pages so that only
+    # a bounded window of rendered pages is held in memory at once
+    if pages is not None:
+        logger.info(f"[START] Segmenting images (pages {pages})")
+    else:
+        logger.info(f"[START] Segmenting images (pages {first_page or 1}-{last_page or 'end'})")
+    segment_dpi = min(PDF_SEGMENT_DPI or PDF_DPI, PDF_DPI)
+    segmented_images = []
+    pending_pages, pending_skipped = [], []
+    failed_pages = []
+    for page_number, img in iter_pdf_pages(
+        file_location,
+        dpi=segment_dpi,
+        first_page=first_page,
+        last_page=last_page,
+        doc_hash=document.doc_hash,
+        pages=pages,
+        failed_pages=failed_pages,
+    ):
+        progress.report("rasterized", page=page_number)
+        pending_pages.append(page_number)
+
+        # Skip segmentation on pages that cannot contain a drawing
+        with time_stage("page_filter"):
+            keep_page, filter_reason = page_may_contain_structures(img)
+        if not keep_page:
+            logger.info(f"Skipping page {page_number}: {filter_reason}")
+            document.skipped_pages.append(page_number)
+            pending_skipped.append(page_number)
+            pages_total.labels(outcome="skipped").inc()
+            progress.report("segmented", page=page_number, segments=0, skipped=filter_reason)
+        else:
+            with time_stage("segment"):
+                if segment_dpi < PDF_DPI:
+                    # Two-resolution mode: segment small, crop at full resolution
+                    segments = segment_images_rerendered(
+                        img, file_location, page_number, segment_dpi, PDF_DPI
+                    )
+                else:
+                    segments = segment_images(img)
+            pages_total.labels(outcome="segmented").inc()
+            segments_total.inc(len(segments or []))
+            progress.report("segmented", page=page_number, segments=len(segments or []))
+            if segments:
+                for segment in segments:
+                    result = PredictionResult(
+                        document_id=document.id,
+                        file_path=file_location,
+                        page=page_number,
+                        segmented_image=segment,
+                        history=[],
+                    )
+                    result.add_history(
+                        "Segmentation", "Success", "Segmented image extracted"
+                    )
+                    segmented_images.append(result)
+
+        # Steps 3-4, then save and checkpoint the finished pages
+        if len(pending_pages) >= CHECKPOINT_PAGES:
+            results = predict_segment_results(document, segmented_images, progress)
+            save_pages(document, pending_pages, pending_skipped, results, progress)
+            saved_count += len(results)
+            segmented_images, pending_pages, pending_skipped = [], [], []
+
+    if pending_pages:
+        results = predict_segment_results(document, segmented_images, progress)
+        save_pages(document, pending_pages, pending_skipped, results, progress)
+        saved_count += len(results)
+    logger.info(
+        f"[END] Segmenting images ({len(document.skipped_pages)} pages skipped by the pre-filter)"
+    )
+
+    # The rendered pages are saved; fail the run so that it is not completed
+    # without the others and is resumed from its checkpoint instead
+    if failed_pages:
+        raise RuntimeError(f"Failed to render page(s) {sorted(failed_pages)}")
+
+    return saved_count
+
+
+def carry_forward_unchanged_pages(
+    document: Document, previous_document: Document
+) -> Tuple[List[PredictionResult], Optional[List[int]]]:
+    """
+    Reuse the previous run's results for pages whose content did not change.
+
+    Pages are matched by content hash rather than by position, so inserting or
+    removing a slide does not invalidate the slides after it. Carried results
+    are renumbered to their new page, and carried skipped pages and SMILES
+    strings are recorded on `document`.
+
+    Args:
+        document (Document): The document being processed, with page hashes.
+        previous_document (Document): The previous run of the same path.
+
+    Returns:
+        Tuple[List[PredictionResult], Optional[List[int]]]: The carried results
+        and the pages that still need processing, or ([], None) if every page
+        must be processed.
+    """
+    if not document.page_hashes or not previous_document.page_hashes:
+        return [], None
+
+    # Only the saved pages of an interrupted run have results to carry
+    unfinished = previous_document.status in UNFINISHED_STATUSES
+    previous_pages = {}
+    for page, page_hash in enumerate(previous_document.page_hashes, start=1):
+        if unfinished and page not in previous_document.completed_pages:
+            continue
+        previous_pages.setdefault(page_hash, page)
+    page_map = {
+        page: previous_pages[page_hash]
+        for page, page_hash in enumerate(document.page_hashes, start=1)
+        if page_hash in previous_pages
+    }
+    if not page_map:
+        return [], None
+
+    # Results belong to the document whose run produced them
+    if previous_document.source_document_id:
+        source_id = previous_document.source_document_id
+        source_run_id = previous_document.source_run_id
+    else:
+        source_id = previous_document.id
+        source_run_id = previous_document.run_id
+    previous_results = get_latest_prediction_results_sync(
+        document_id=source_id, max_run_id=source_run_id
+    )
+    results_by_page: Dict[int, List[PredictionResult]] = {}
+    for res in previous_results:
+        results_by_page.setdefault(res.page, []).append(res)
+
+    carried_results = []
+    for page, previous_page in sorted(page_map.items()):
+        if previous_page in previous_document.skipped_pages:
+            document.skipped_pages.append(page)
+        for previous_result in results_by_page.get(previous_page, []):
+            result = previous_result.model_copy(deep=True)
+            result.id = uuid.uuid4()
+            result.document_id = document.id
+            result.run_id = document.run_id
+            result.page = page
+            result.add_history(
+                "Incremental Reprocessing",
+                "Carried forward",
+                f"Page unchanged since run {source_run_id} (was page {previous_page})",
+            )
+            if result.predicted_smiles:
+                document.predicted_smiles_list.append(result.predicted_smiles)
+            carried_results.append(result)
+
+    pages_to_process = [
+        page for page in range(1, len(document.page_hashes) + 1) if page not in page_map
+    ]
+    logger.info(
+        f"[INCREMENTAL] {len(page_map)} unchanged page(s) carried forward, "
+        f"{len(pages_to_process)} page(s) to process"
+    )
+    return carried_results, pages_to_process
+
+
+def summarize_results(document: Document, results: List[PredictionResult]) -> dict:
+    """
+    Build the compact task result for a document run.
+
+    Segment images are not included; they are stored once in MongoDB and
+    served by the paginated results and image endpoints.
+    """
+    if document.source_document_id:
+        document_id, run_id = document.source_document_id, document.source_run_id
+    else:
+        document_id, run_id = document.id, document.run_id
+    return {
+        "document_id": str(document_id),
+        "run_id": run_id,
+        "file_path": document.file_path,
+        "result_count": len(results),
+        "predicted_count": sum(1 for res in results if res.predicted_smiles),
+        "skipped_pages": document.skipped_pages,
+        "results": [res.summary() for res in results],
+    }
+
+
+def finalize_run(document: Document, page_count: Optional[int] = None) -> dict:
+    """
+    Mark a document run as completed once all of its pages are saved, and
+    return the compact task result.
+
+    Args:
+        document (Document): The document run to complete.
+        page_count (int, optional): The number of pages of the document. When
+            not given, it is the number of page hashes, or read from the file
+            if there are none.
+
+    Raises:
+        RuntimeError: If the page count is unknown or a page was never saved.
+    """
+    # Step 5. TRY enrichment hooks
+    # logger.info("[START] Looking for Data Enrichment hooks")
+    # Get hook name from environment variable
+    # hook_pipeline_en = os.getenv("SMILES_PRED_ENRICH")
+    # if hook_pipeline_en is not None:
+    #     logger.info(
+    #         f"[START] Found {hook_pipeline_en}: Executing Data Enrichment hooks"
+    #     )
+    #     execute_hooks(pipeline=hook_pipeline_en, document=document, results=results)
+    # logger.info("[END] Data Enrichment hooks")
+
+    # Step 6: Save to MongoDB. Results were saved page by page; page-range
+    # subtasks may have checkpointed pages this process has not seen
+    logger.info("[START] Completing document run in MongoDB")
+    with time_stage("mongo_save"):
+        results = get_run_prediction_results_sync(document.id, document.run_id)
+        stored_document = get_document_run_sync(document.id, document.run_id)
+        if stored_document:
+            document.skipped_pages = sorted(set(stored_document.skipped_pages))
+            document.completed_pages = sorted(set(stored_document.completed_pages))
+        # Page hashes are missing when the PDF could not be parsed for them
+        page_count = (
+            page_count or len(document.page_hashes) or get_page_count(document.file_path)
+        )
+        if not page_count:
+            raise RuntimeError("Could not determine the page count to check the run")
+        missing_pages = [
+            page for page in range(1, page_count + 1)
+            if page not in document.completed_pages
+        ]
+        if missing_pages:
+            raise RuntimeError(f"Page(s) {missing_pages} were never saved")
+        document.predicted_smiles_list = [
+            res.predicted_smiles for res in results if res.predicted_smiles
+        ]
+        document.status = "completed"
+        document.date_updated = datetime.now(pytz.utc)
+        save_document_sync(document)
+    logger.info("[END] Completing document run in MongoDB")
+
+    # # Step 7: Run Post hooks
+    # logger.info("[START] Looking for POST hooks")
+    # hook_pipeline_post = os.getenv("SMILES_PRED_POST")
+    # if hook_pipeline_post is not None:
+    #     logger.info(f"[START] Found {hook_pipeline_post}: Executing Post hooks")
+    #     execute_hooks(
+    #         pipeline=hook_pipeline_post, document=document, results=results
+    #     )
+    # logger.info("[END] Post hooks")
+
+    # Step 8: Summarize results
+    return summarize_results(document, results)
+
+
+# Worker crashes redeliver the task, which then resumes from the checkpoint
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True)
 def predict_smiles(self, file_location: str, origin_ext_path: str):
     logger.info(f"Processing file: {file_location} {origin_ext_path}")
+    progress = ProgressReporter(self)
+    document = None
+    leased, fanned_out = False, False
     try:
-        results = []
-        serialized_results = []
-
         # Generate a document ID and metadata
         logger.info("[START] Generating document ID and metadata")
         document_id = uuid.uuid4()
@@ -40,72 +477,117 @@ def predict_smiles(self, file_location: str, origin_ext_path: str):
         document.doc_hash = calculate_file_hash(file_location)
         logger.info("[END] Generating document ID and metadata")
 
-        # Check if the document already exists in the database and compare hashes
+        # Check for a prior run on identical content (under any path) before
+        # falling back to the document previously stored at this path
         logger.info("[CHECK] Checking for existing document in the database")
         existing_document = get_document_by_file_path_sync(file_location)
-        if existing_document:
-            run_id = existing_document.run_id + 1
-            document.id = existing_document.id
-            document.ext_path = origin_ext_path
-            existing_document.ext_path = origin_ext_path
-            # if existing_document.doc_hash == document.doc_hash:
-            if True:
-                logger.info(
-                    "Document already exists in the database with the same hash."
-                )
-
-                # Retrieve the latest prediction result using the repository function
-                latest_result = get_latest_prediction_results_sync(
-                    document_id=existing_document.id,
-                    max_run_id=existing_document.run_id,
-                )
-                if latest_result:
-
-                    # Run enrichment and post hooks
-                    logger.info("[START] Looking for Data Enrichment hooks")
-                    # Get hook name from environment variable
-                    hook_pipeline_en = os.getenv("SMILES_PRED_ENRICH")
-                    if hook_pipeline_en is not None:
-                        logger.info(
-                            f"[START] Found {hook_pipeline_en}: Executing Data Enrichment hooks"
-                        )
-                        execute_hooks(
-                            pipeline=hook_pipeline_en,
-                            document=existing_document,
-                            results=latest_result,
-                        )
-                    logger.info("[END] Data Enrichment hooks")
-
-                    logger.info("[START] Looking for POST hooks")
-                    hook_pipeline_post = os.getenv("SMILES_PRED_POST")
-                    if hook_pipeline_post is not None:
-                        logger.info(
-                            f"[START] Found {hook_pipeline_post}: Executing Post hooks"
-                        )
-                        execute_hooks(
-                            pipeline=hook_pipeline_post,
-                            document=existing_document,
-                            results=latest_result,
-                        )
-                    logger.info("[END] Post hooks")
+        identical_document = get_document_by_hash_sync(document.doc_hash)
+        if identical_document:
+            # Results belong to the document whose run produced them
+            if identical_document.source_document_id:
+                source_id = identical_document.source_document_id
+                source_run_id = identical_document.source_run_id
+            else:
+                source_id = identical_document.id
+                source_run_id = identical_document.run_id
 
+            latest_result = get_latest_prediction_results_sync(
+                document_id=source_id, max_run_id=source_run_id
+            )
+            # A completed run is reused even if it found no structures. Runs
+            # stored before run statuses were recorded are only reused when
+            # they have results.
+            if identical_document.status == "completed" or latest_result:
+                if (
+                    existing_document
+                    and existing_document.doc_hash == document.doc_hash
+                    and existing_document.status not in UNFINISHED_STATUSES
+                ):
                     logger.info(
-                        "Returning the latest result for the existing document."
+                        "Document already exists in the database with the same hash."
                     )
-                    for res in latest_result:
-                        serialized_results.append(res.json_serializable())
-                    return serialized_results
+                    existing_document.ext_path = origin_ext_path
+                    reused_document = existing_document
                 else:
-                    logger.warning(
-                        "No prediction results found for the existing document."
+                    logger.info(
+                        f"Identical content was already processed as "
+                        f"'{identical_document.file_path}'. Linking to its prediction run."
                     )
-                    return None  # No results available
-            else:
+                    if existing_document:
+                        document.id = existing_document.id
+                        document.run_id = existing_document.run_id + 1
+                    document.source_document_id = source_id
+                    document.source_run_id = source_run_id
+                    document.page_hashes = identical_document.page_hashes
+                    document.skipped_pages = identical_document.skipped_pages
+                    document.predicted_smiles_list = [
+                        res.predicted_smiles for res in latest_result if res.predicted_smiles
+                    ]
+                    document.status = "completed"
+                    save_document_sync(document)
+                    reused_document = document
+
+                # Run enrichment and post hooks on the hooks queue
+                logger.info("[START] Dispatching Data Enrichment and POST hooks")
+                hooks_task_id = dispatch_hooks(
+                    document=reused_document,
+                    results=latest_result,
+                    progress_task_id=progress.task_id,
+                )
+                logger.info("[END] Dispatching Data Enrichment and POST hooks")
+
+                logger.info("Returning the latest result for the identical document.")
+                summary = summarize_results(reused_document, latest_result)
+                progress.report("completed", hooks_pending=bool(hooks_task_id), **summary)
+                return summary
+
+            logger.warning(
+                "Identical document has no prediction results. Proceeding with new processing."
+            )
+
+        resuming = (
+            existing_document is not None
+            and existing_document.status in UNFINISHED_STATUSES
+            and existing_document.doc_hash == document.doc_hash
+        )
+        if resuming:
+            # Continue the interrupted run of this content from its checkpoint
+            logger.info(
+                f"Resuming run {existing_document.run_id} after "
+                f"{len(existing_document.completed_pages)} saved page(s)"
+            )
+            existing_document.ext_path = origin_ext_path
+            document = existing_document
+        elif existing_document:
+            if existing_document.doc_hash != document.doc_hash:
                 logger.warning(
                     "Document exists but hash mismatch. Proceeding with new processing."
                 )
+            run_id = existing_document.run_id + 1
+            document.id = existing_document.id
+
+        if not resuming:
+            document.run_id = run_id
+
+        # Take the run before touching it. Its status only says that it was
+        # started: a redelivered copy of a task that is still running (the
+        # broker redelivers after its visibility timeout) also sees
+        # "processing", and must not delete and redo the pages in flight.
+        holder = acquire_run_lease(document.id, document.run_id, self.request.id, exclusive=True)
+        if holder == self.request.id:
+            logger.warning(
+                f"Run {document.run_id} of {file_location} is still being processed by "
+                f"another delivery of this task; dropping this one"
+            )
+            raise Ignore()
+        if holder:
+            logger.warning(
+                f"Run {document.run_id} of {file_location} is being processed by task {holder}"
+            )
+            progress.report("failed", error=f"The document is being processed by task {holder}")
+            return []
+        leased = True
 
-        document.run_id = run_id
         # Step 1: Read the document and extract images
         logger.info("[START] Pre-processing document")
         if not os.path.isfile(file_location):
@@ -116,88 +598,176 @@ def predict_smiles(self, file_location: str, origin_ext_path: str):
             logger.warning("Unsupported document type. Only PDF files are supported.")
             return []
 
-        img_doc = pdf_to_images(file_location)
-        if not img_doc:
+        page_count = get_page_count(file_location)
+        if not page_count:
             logger.error("Failed to extract content from PDF document.")
             return []
+        document.page_hashes = calculate_page_hashes(file_location)
+        if document.page_hashes and len(document.page_hashes) != page_count:
+            logger.warning(
+                f"Found {len(document.page_hashes)} page hashes for {page_count} pages; "
+                f"not reusing unchanged pages"
+            )
+            document.page_hashes = []
         logger.info("[END] Pre-processing document")
 
-        # Step 2: Segment the chemical structures
-        logger.info("[START] Segmenting images")
-        segmented_images = []
-        for page_number, img in enumerate(img_doc):
-            segments = segment_images(img)
-            if segments:
-                for segment in segments:
-                    result = PredictionResult(
-                        document_id=document.id,
-                        file_path=file_location,
-                        page=page_number + 1,
-                        segmented_image=segment,
-                        history=[],
-                    )
-                    result.add_history(
-                        "Segmentation", "Success", "Segmented image extracted"
-                    )
-                    segmented_images.append(result)
-        logger.info("[END] Segmenting images")
-
-        # Step 3: Predict SMILES strings
-        logger.info("[START] Predicting SMILES strings")
-        for result in segmented_images:
-            smiles, confidence = predict_smiles_from_segment(result.segmented_image)
-            if smiles:
-                result.predicted_smiles = smiles
-                result.confidence = confidence
-                result.add_history(
-                    "SMILES Prediction",
-                    "Success" if confidence >= 0.5 else "Low confidence",
-                    f"Predicted SMILES: {smiles} with confidence {confidence}",
+        carried_results = []
+        if resuming:
+            # Drop results written after the last checkpoint; those pages are redone
+            pages_to_process = [
+                page for page in range(1, page_count + 1)
+                if page not in document.completed_pages
+            ]
+            deleted = delete_uncheckpointed_results_sync(
+                document.id, document.run_id, pages_to_process
+            )
+            if deleted:
+                logger.info(f"Deleted {deleted} result(s) saved after the last checkpoint")
+            document.status = "processing"
+            save_document_sync(document)
+        else:
+            # Only process pages that changed since the previous run of this path
+            pages_to_process = None
+            if existing_document and document.page_hashes:
+                carried_results, pages_to_process = carry_forward_unchanged_pages(
+                    document, existing_document
                 )
-                document.predicted_smiles_list.append(smiles)
-            else:
-                result.add_history(
-                    "SMILES Prediction", "Failed", "Failed to predict SMILES string"
+            if pages_to_process is None:
+                pages_to_process = list(range(1, page_count + 1))
+
+            # Register the run, then save the carried pages as its first checkpoint
+            document.status = "processing"
+            save_document_sync(document)
+            carried_pages = [
+                page for page in range(1, page_count + 1) if page not in pages_to_process
+            ]
+            save_pages(
+                document,
+                carried_pages,
+                [page for page in document.skipped_pages if page in carried_pages],
+                carried_results,
+            )
+        # Partial results of the run can be queried by these ids while it
+        # runs, so every event from here on carries them
+        progress.context.update(document_id=str(document.id), run_id=document.run_id)
+        progress.report(
+            "started",
+            page_count=page_count,
+            pages_to_process=len(pages_to_process),
+            results=[res.summary() for res in carried_results],
+        )
+
+        # Fan out long documents across workers, one subtask per page range
+        if PAGE_FANOUT_SIZE and len(pages_to_process) > PAGE_FANOUT_SIZE:
+            document_data = document.json_serializable()
+            page_chunks = [
+                pages_to_process[index:index + PAGE_FANOUT_SIZE]
+                for index in range(0, len(pages_to_process), PAGE_FANOUT_SIZE)
+            ]
+            logger.info(
+                f"[FAN-OUT] Splitting {len(pages_to_process)} pages into {len(page_chunks)} subtasks"
+            )
+            fanned_out = True
+            return self.replace(
+                chord(
+                    group(
+                        predict_smiles_pages.s(document_data, chunk)
+                        for chunk in page_chunks
+                    ),
+                    merge_page_results.s(document_data),
                 )
-            result.run_id = run_id
-            results.append(result)
-        logger.info("[END] Predicting SMILES strings")
-
-        # Step 4. TRY enrichment hooks
-        # logger.info("[START] Looking for Data Enrichment hooks")
-        # Get hook name from environment variable
-        # hook_pipeline_en = os.getenv("SMILES_PRED_ENRICH")
-        # if hook_pipeline_en is not None:
-        #     logger.info(
-        #         f"[START] Found {hook_pipeline_en}: Executing Data Enrichment hooks"
-        #     )
-        #     execute_hooks(pipeline=hook_pipeline_en, document=document, results=results)
-        # logger.info("[END] Data Enrichment hooks")
-
-        # Step 5: Save to MongoDB
-        logger.info("[START] Saving results to MongoDB")
+            )
+
+        # Steps 2-4: Segment, predict and save the new and changed pages
+        process_pages(document, pages=pages_to_process, progress=progress)
+
+        # Steps 5-8: Complete the run and summarize
+        summary = finalize_run(document, page_count)
+        progress.report("completed", hooks_pending=False, **summary)
+        return summary
+
+    except Ignore:
+        # Raised by self.replace once the fan-out chord has been scheduled
+        raise
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        if document is not None and document.status == "processing":
+            set_document_status_sync(document.id, document.run_id, "failed")
+        progress.report("failed", error=str(e))
+        return []
+    finally:
+        if leased:
+            # A fanned-out run stays leased until its subtasks take over
+            release_run_lease(
+                document.id, document.run_id, self.request.id, hand_over=fanned_out
+            )
+
+
+@celery_app.task(bind=True, acks_late=True, reject_on_worker_lost=True)
+def predict_smiles_pages(self, document_data: dict, pages: List[int]):
+    """
+    Rasterize, segment, predict and save one page range of a fanned-out
+    document, skipping pages already checkpointed by an earlier attempt.
+    """
+    logger.info(
+        f"Processing pages {pages[0]}-{pages[-1]} of {document_data['file_path']}"
+    )
+    document = Document(**document_data)
+    # Shared with the sibling subtasks; fails while another delivery of this
+    # subtask is still running or the run is being resumed by a new task
+    holder = acquire_run_lease(document.id, document.run_id, self.request.id)
+    if holder:
+        logger.warning(
+            f"Run {document.run_id} of {document.file_path} is held by task {holder}; "
+            f"dropping pages {pages[0]}-{pages[-1]}"
+        )
+        raise Ignore()
+    try:
+        stored_document = get_document_run_sync(document.id, document.run_id)
+        if stored_document and stored_document.completed_pages:
+            pages = [page for page in pages if page not in stored_document.completed_pages]
+            if not pages:
+                return {"pages": [], "result_count": 0}
+        if (self.request.delivery_info or {}).get("redelivered"):
+            # Drop results this range wrote after its last checkpoint before
+            # the worker was lost. Sibling subtasks own the other pages of the run.
+            deleted = delete_uncheckpointed_results_sync(document.id, document.run_id, pages)
+            if deleted:
+                logger.info(f"Deleted {deleted} result(s) saved after the last checkpoint")
+        # Only report the pages skipped within this range
+        document.skipped_pages = []
         try:
-            save_document_sync(document)
-            save_prediction_results_sync(results)
+            progress = ProgressReporter(
+                self, document_id=str(document.id), run_id=document.run_id
+            )
+            saved_count = process_pages(document, pages=pages, progress=progress)
         except Exception as e:
+            # The merge task will not run; leave the run resumable
             logger.error(f"An error occurred: {e}")
-        logger.info("[END] Saving results to MongoDB")
-
-        # # Step 6: Run Post hooks
-        # logger.info("[START] Looking for POST hooks")
-        # hook_pipeline_post = os.getenv("SMILES_PRED_POST")
-        # if hook_pipeline_post is not None:
-        #     logger.info(f"[START] Found {hook_pipeline_post}: Executing Post hooks")
-        #     execute_hooks(
-        #         pipeline=hook_pipeline_post, document=document, results=results
-        #     )
-        # logger.info("[END] Post hooks")
-
-        # Step 6: Serialize results
-        for res in results:
-            serialized_results.append(res.json_serializable())
-        return serialized_results
+            set_document_status_sync(document.id, document.run_id, "failed")
+            raise
+        return {"pages": pages, "result_count": saved_count}
+    finally:
+        release_run_lease(document.id, document.run_id, self.request.id)
 
+
+@celery_app.task(bind=True)
+def merge_page_results(self, page_results: List[dict], document_data: dict):
+    """
+    Complete a fanned-out document run once all page-range subtasks have
+    saved their pages, and return the compact task result.
+    """
+    document = Document(**document_data)
+    progress = ProgressReporter(self, document_id=str(document.id), run_id=document.run_id)
+    logger.info(
+        f"Merging {len(page_results)} page ranges of {document.file_path}"
+    )
+    try:
+        summary = finalize_run(document)
+        progress.report("completed", hooks_pending=False, **summary)
+        return summary
     except Exception as e:
         logger.error(f"An error occurred: {e}")
+        set_document_status_sync(document.id, document.run_id, "failed")
+        progress.report("failed", error=str(e))
         return []
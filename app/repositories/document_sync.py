@@ -1,6 +1,9 @@
-from typing import List, Union
+from datetime import datetime
+from typing import List, Optional, Union
+import pytz
 from fastapi import HTTPException, status
 from pydantic import UUID4
+from pymongo import DESCENDING
 from pymongo.errors import PyMongoError
 from app.core.mongo_config import get_sync_collection
 from app.schema.inputs.document import Document
@@ -10,12 +13,15 @@ from app.core.logging_config import logger
 def save_document_sync(document: Document) -> UUID4:
     """
     Save document metadata to MongoDB synchronously.
+    A document is stored once per run, so an existing record of the same run is replaced.
     """
     logger.info("Saving document to MongoDB (sync)")
     try:
         collection = get_sync_collection("documents")
         doc_dict = document.model_dump()
-        collection.insert_one(doc_dict)
+        collection.replace_one(
+            {"id": document.id, "run_id": document.run_id}, doc_dict, upsert=True
+        )
         return document.id
     except PyMongoError as e:
         logger.error(f"Failed to save document (sync): {str(e)}")
@@ -25,14 +31,76 @@ def save_document_sync(document: Document) -> UUID4:
         )
 
 
-def get_document_by_field_sync(field: str, value: Union[str, UUID4, List[str]]) -> Document:
+def checkpoint_document_pages_sync(
+    doc_id: UUID4, run_id: int, pages: List[int], skipped_pages: List[int]
+):
+    """
+    Record pages of a run whose results are saved, and those among them that
+    the page pre-filter skipped, synchronously.
+    Concurrent page-range subtasks of the same run can checkpoint safely.
+    """
+    try:
+        collection = get_sync_collection("documents")
+        collection.update_one(
+            {"id": doc_id, "run_id": run_id},
+            {
+                "$addToSet": {
+                    "completed_pages": {"$each": pages},
+                    "skipped_pages": {"$each": skipped_pages},
+                },
+                "$set": {"date_updated": datetime.now(pytz.utc)},
+            },
+        )
+    except PyMongoError as e:
+        logger.error(f"Failed to checkpoint document pages (sync): {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to checkpoint document pages: {str(e)}"
+        )
+
+
+def set_document_status_sync(doc_id: UUID4, run_id: int, run_status: str):
+    """Set the processing state of a document run synchronously."""
+    try:
+        collection = get_sync_collection("documents")
+        collection.update_one(
+            {"id": doc_id, "run_id": run_id},
+            {"$set": {"status": run_status, "date_updated": datetime.now(pytz.utc)}},
+        )
+    except PyMongoError as e:
+        logger.error(f"Failed to set document status (sync): {str(e)}")
+
+
+def get_document_run_sync(doc_id: UUID4, run_id: int) -> Optional[Document]:
+    """Retrieve one run of a document synchronously."""
+    try:
+        collection = get_sync_collection("documents")
+        document = collection.find_one({"id": doc_id, "run_id": run_id})
+        return Document(**document) if document else None
+    except PyMongoError as e:
+        logger.error(f"Error retrieving document run (sync): {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving document: {str(e)}",
+        )
+
+
+def get_document_by_field_sync(
+    field: str, value: Union[str, UUID4, List[str]], finished_only: bool = False
+) -> Document:
     """
     Retrieve a document from MongoDB based on a specified field and value synchronously.
+    A document is stored once per run, so the most recent run is returned.
+    With `finished_only`, runs that are still processing or failed are ignored.
     """
     try:
         collection = get_sync_collection("documents")
         query = {field: value}
-        document = collection.find_one(query)
+        if finished_only:
+            query["status"] = {"$nin": ["processing", "failed"]}
+        document = collection.find_one(
+            query, sort=[("run_id", DESCENDING), ("date_updated", DESCENDING)]
+        )
         if document:
             return Document(**document)
         else:
@@ -51,8 +119,8 @@ def get_document_by_id_sync(doc_id: UUID4) -> Document:
 
 
 def get_document_by_hash_sync(doc_hash: str) -> Document:
-    """Retrieve a document by its hash synchronously."""
-    return get_document_by_field_sync("doc_hash", doc_hash)
+    """Retrieve the latest finished run of a document by its hash synchronously."""
+    return get_document_by_field_sync("doc_hash", doc_hash, finished_only=True)
 
 
 def get_document_by_filename_sync(filename: str) -> Document:
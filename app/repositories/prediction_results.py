@@ -1,10 +1,24 @@
+import base64
 from typing import List, Optional
+from uuid import UUID
 from pymongo.errors import PyMongoError
 from fastapi import HTTPException, status
 from app.core.mongo_config import get_async_collection, get_sync_collection
 from app.schema.results.prediction_result import PredictionResult
 from app.core.logging_config import logger
-from app.utils.img_decode import decode_image_from_base64
+
+
+_indexes_ensured = False
+
+
+def _ensure_prediction_result_indexes_sync(collection):
+    """Create the indexes used to page through results and fetch images, once per process."""
+    global _indexes_ensured
+    if _indexes_ensured:
+        return
+    collection.create_index("id")
+    collection.create_index([("document_id", 1), ("run_id", 1), ("page", 1)])
+    _indexes_ensured = True
 
 
 def save_prediction_results_sync(results: List[PredictionResult]):
@@ -22,6 +36,9 @@ def save_prediction_results_sync(results: List[PredictionResult]):
     collection = get_sync_collection("prediction_results")
 
     try:
+        _ensure_prediction_result_indexes_sync(collection)
+
+
         # Convert the results to JSON-serializable format (with Base64 encoded images)
         documents = [result.json_serializable() for result in results]
 
@@ -102,15 +119,10 @@ def get_latest_prediction_results_sync(
         # Fetch all documents with the highest run_id
         results = collection.find({"document_id": document_id, "run_id": max_run_id})
 
-        prediction_results = []
-        for result in results:
-            # Deserialize the segmented_image field if it exists
-            if "segmented_image" in result and result["segmented_image"]:
-                result["segmented_image"] = decode_image_from_base64(
-                    result["segmented_image"]
-                )
-            # Convert the result to a PredictionResult object
-            prediction_results.append(PredictionResult(**result))
+        # Convert each stored result (with its Base64 image) to a PredictionResult
+        prediction_results = [
+            PredictionResult.from_json_serializable(result) for result in results
+        ]
 
         return prediction_results
 
@@ -120,3 +132,128 @@ def get_latest_prediction_results_sync(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch the latest prediction results.",
         )
+
+
+def get_run_prediction_results_sync(
+    document_id: UUID, run_id: int, include_images: bool = False
+) -> List[PredictionResult]:
+    """
+    Retrieve all prediction results of one document run, ordered by page.
+
+    :param document_id: The UUID of the document.
+    :param run_id: The run to read.
+    :param include_images: Whether to load and decode the segmented images.
+    :return: A list of PredictionResult objects.
+    """
+    collection = get_sync_collection("prediction_results")
+    try:
+        projection = None if include_images else {"segmented_image": 0}
+        cursor = collection.find(
+            {"document_id": document_id, "run_id": run_id}, projection=projection
+        ).sort("page", 1)
+        return [PredictionResult.from_json_serializable(result) for result in cursor]
+    except PyMongoError as e:
+        logger.error(f"Error retrieving prediction results of run {run_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch prediction results.",
+        )
+
+
+def delete_uncheckpointed_results_sync(
+    document_id: UUID, run_id: int, pages: List[int]
+) -> int:
+    """
+    Delete the results a run saved for the given pages, which were never
+    checkpointed and are about to be processed again, so that they are not
+    stored twice.
+
+    Only pass pages owned by the caller: other tasks of a fanned-out run may
+    have saved results for their own pages that are not checkpointed yet.
+
+    :return: The number of deleted results.
+    """
+    if not pages:
+        return 0
+    collection = get_sync_collection("prediction_results")
+    try:
+        result = collection.delete_many(
+            {
+                "document_id": document_id,
+                "run_id": run_id,
+                "page": {"$in": pages},
+            }
+        )
+        return result.deleted_count
+    except PyMongoError as e:
+        logger.error(f"Error deleting partial prediction results: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to delete partial prediction results.",
+        )
+
+
+async def get_prediction_results_page(
+    document_id: UUID, run_id: Optional[int] = None, skip: int = 0, limit: int = 50
+) -> dict:
+    """
+    Retrieve one page of prediction results for a document, without images.
+
+    :param document_id: The UUID of the document the results belong to.
+    :param run_id: The run to read. If None, the latest run is used.
+    :param skip: The number of results to skip.
+    :param limit: The maximum number of results to return.
+    :return: A dictionary with the run_id, the total count and the results.
+    """
+    collection = await get_async_collection("prediction_results")
+    try:
+        if run_id is None:
+            latest = await collection.find_one(
+                {"document_id": document_id},
+                sort=[("run_id", DESCENDING)],
+                projection={"run_id": 1},
+            )
+            if not latest:
+                return {"run_id": None, "total": 0, "results": []}
+            run_id = latest["run_id"]
+
+        query = {"document_id": document_id, "run_id": run_id}
+        total = await collection.count_documents(query)
+        cursor = (
+            collection.find(query, projection={"_id": 0, "segmented_image": 0})
+            .sort("page", 1)
+            .skip(skip)
+            .limit(limit)
+        )
+        results = await cursor.to_list(length=limit)
+        return {"run_id": run_id, "total": total, "results": results}
+
+    except PyMongoError as e:
+        logger.error(f"Error retrieving prediction results: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch prediction results.",
+        )
+
+
+async def get_prediction_result_image(result_id: UUID) -> Optional[bytes]:
+    """
+    Retrieve the PNG bytes of the segmented image of a prediction result.
+
+    :param result_id: The UUID of the prediction result.
+    :return: The PNG image, or None if the result or its image does not exist.
+    """
+    collection = await get_async_collection("prediction_results")
+    try:
+        result = await collection.find_one(
+            {"id": result_id}, projection={"_id": 0, "segmented_image": 1}
+        )
+    except PyMongoError as e:
+        logger.error(f"Error retrieving prediction result image: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch the prediction result image.",
+        )
+    if not result or not result.get("segmented_image"):
+        return None
+    return base64.b64decode(result["segmented_image"])
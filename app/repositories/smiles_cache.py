@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+import pytz
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+from app.core.mongo_config import get_sync_collection
+from app.core.logging_config import logger
+
+COLLECTION_NAME = "smiles_cache"
+
+
+def ensure_smiles_cache_indexes_sync(ttl_seconds: int):
+    """
+    Create the lookup index and the TTL index that evicts entries which have
+    not been used for `ttl_seconds`.
+    """
+    try:
+        collection = get_sync_collection(COLLECTION_NAME)
+        collection.create_index(
+            [("key", ASCENDING), ("model_version", ASCENDING)], unique=True
+        )
+        collection.create_index("last_used", expireAfterSeconds=ttl_seconds)
+    except PyMongoError as e:
+        logger.error(f"Error creating SMILES cache indexes (sync): {str(e)}")
+
+
+def get_cached_prediction_sync(key: str, model_version: str) -> Optional[Dict[str, Any]]:
+    """
+    Retrieve a cached prediction for a segment key and model version, and mark
+    it as recently used.
+    """
+    try:
+        collection = get_sync_collection(COLLECTION_NAME)
+        return collection.find_one_and_update(
+            {"key": key, "model_version": model_version},
+            {"$set": {"last_used": datetime.now(pytz.utc)}},
+            projection={"_id": 0},
+        )
+    except PyMongoError as e:
+        logger.error(f"Error retrieving cached prediction (sync): {str(e)}")
+        return None
+
+
+def save_cached_prediction_sync(entry: Dict[str, Any]):
+    """Insert or refresh a cached prediction."""
+    try:
+        collection = get_sync_collection(COLLECTION_NAME)
+        now = datetime.now(pytz.utc)
+        collection.update_one(
+            {"key": entry["key"], "model_version": entry["model_version"]},
+            {"$set": {**entry, "last_used": now}, "$setOnInsert": {"date_created": now}},
+            upsert=True,
+        )
+    except PyMongoError as e:
+        logger.error(f"Error saving cached prediction (sync): {str(e)}")
+
+
+def delete_stale_predictions_sync(model_version: str) -> int:
+    """Delete cached predictions made by any other model version."""
+    try:
+        collection = get_sync_collection(COLLECTION_NAME)
+        result = collection.delete_many({"model_version": {"$ne": model_version}})
+        return result.deleted_count
+    except PyMongoError as e:
+        logger.error(f"Error deleting stale cached predictions (sync): {str(e)}")
+        return 0
@@ -21,6 +21,10 @@ class Document(BaseModel):
     link: Optional[str] = Field(None, title="The link to the input file")
     ext_id: Optional[str] = Field(None, title="The external identifier of the input file")
 
+    # Set when the results were reused from a prior run on identical content
+    source_document_id: Optional[UUID4] = Field(None, title="The document whose prediction run produced the results")
+    source_run_id: Optional[int] = Field(None, title="The prediction run that produced the results")
+
     # Optional timestamps
     date_created: Optional[datetime] = Field(default_factory=lambda: datetime.now(pytz.utc), title="The date and time of the file upload")
     date_updated: Optional[datetime] = Field(default_factory=lambda: datetime.now(pytz.utc), title="The date and time of the last update")
@@ -39,6 +43,18 @@ class Document(BaseModel):
     molecule_tags: List[str] = Field(default_factory=list, title="Molecule tags associated with the document")
     daikon_molecule_ids: List[str] = Field(default_factory=list, title="Daikon molecule IDs associated with the document")
     predicted_smiles_list: List[str] = Field(default_factory=list, title="List of predicted SMILES strings")
+
+    # Content hash of each page, used to only reprocess changed pages
+    page_hashes: List[str] = Field(default_factory=list, title="The SHA-256 hash of each page's content")
+
+    # Pages rejected by the page pre-filter and never segmented
+    skipped_pages: List[int] = Field(default_factory=list, title="Pages skipped by the page pre-filter")
+
+    # Processing state of the run ("processing", "failed" or "completed"; None
+    # for runs stored before it was tracked) and the pages whose results are
+    # already saved, from which an interrupted run resumes
+    status: Optional[str] = Field(None, title="The processing state of the run")
+    completed_pages: List[int] = Field(default_factory=list, title="Pages whose results are saved")
     
     def json_serializable(self) -> dict:
         """Convert the object to a JSON-serializable dictionary."""
@@ -51,6 +67,8 @@ class Document(BaseModel):
             "doc_hash": self.doc_hash,
             "link": self.link,
             "ext_id": self.ext_id,
+            "source_document_id": str(self.source_document_id) if self.source_document_id else None,
+            "source_run_id": self.source_run_id,
             "date_created": self.date_created,
             "date_updated": self.date_updated,
             "created_by": self.created_by,
@@ -61,5 +79,9 @@ class Document(BaseModel):
             "tags": self.tags,
             "molecule_tags": self.molecule_tags,
             "daikon_molecule_ids": self.daikon_molecule_ids,
-            "predicted_smiles_list": self.predicted_smiles_list
+            "predicted_smiles_list": self.predicted_smiles_list,
+            "page_hashes": self.page_hashes,
+            "skipped_pages": self.skipped_pages,
+            "status": self.status,
+            "completed_pages": self.completed_pages
         }
\ No newline at end of file
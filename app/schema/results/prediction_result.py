@@ -2,9 +2,11 @@ from typing import List, Optional, Any
 import numpy as np
 from pydantic import UUID4, BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
+from uuid import uuid4
 import pytz
 import base64
 import cv2
+from app.utils.img_decode import decode_image_from_base64
 
 class PipelineHistory(BaseModel):
     step: str
@@ -15,6 +17,7 @@ class PipelineHistory(BaseModel):
 
 class PredictionResult(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
+    id: UUID4 = Field(default_factory=uuid4, title="The unique identifier of the prediction result")
     document_id: UUID4
     run_id: Optional[int] = Field(0, title="The unique identifier of the prediction run")
     file_path: str = Field(..., title="The path to the input file")
@@ -47,6 +50,7 @@ class PredictionResult(BaseModel):
     def json_serializable(self) -> dict:
         """Convert the object to a JSON-serializable dictionary."""
         return {
+            "id": self.id,
             "run_date": self.run_date.isoformat(),
             "document_id": self.document_id,
             "run_id": self.run_id,
@@ -60,11 +64,38 @@ class PredictionResult(BaseModel):
             "history": [entry.model_dump() for entry in self.history]
         }
 
+    @classmethod
+    def from_json_serializable(cls, data: dict) -> "PredictionResult":
+        """Rebuild a result from the output of `json_serializable`."""
+        data = dict(data)
+        data.pop("_id", None)
+        if data.get("segmented_image"):
+            data["segmented_image"] = decode_image_from_base64(data["segmented_image"])
+        confidence = data.pop("confidence", None)
+        result = cls(**data)
+        result.confidence = confidence
+        return result
+
+    def summary(self) -> dict:
+        """Return the compact, image-free form of the result."""
+        return {
+            "id": str(self.id),
+            "page": self.page,
+            "predicted_smiles": self.predicted_smiles,
+            "confidence": self.confidence,
+        }
+
+    def image_to_png(self) -> bytes:
+        """Encode the np.ndarray image as PNG bytes."""
+        if self.segmented_image is not None:
+            _, buffer = cv2.imencode('.png', self.segmented_image)
+            return buffer.tobytes()
+        return b""
+
     def image_to_base64(self) -> str:
         """Convert np.ndarray image to Base64 string."""
         if self.segmented_image is not None:
-            _, buffer = cv2.imencode('.png', self.segmented_image)
-            return base64.b64encode(buffer).decode('utf-8')
+            return base64.b64encode(self.image_to_png()).decode('utf-8')
         return ""
 
     def add_history(self, step: str, status: str, details: Optional[str] = None) -> None:
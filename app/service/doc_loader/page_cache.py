@@ -0,0 +1,134 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from app.core.logging_config import logger
+
+# Rendered pages are stored as raw .npy arrays so they can be memory-mapped back
+project_root = Path(__file__).resolve().parent.parent.parent.parent
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "True").lower() == "true"
+PAGE_CACHE_DIR = Path(os.getenv("PAGE_CACHE_DIR", str(project_root / "var" / "page_cache")))
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(5 * 1024**3)))
+
+# Temporary files older than this were left by a worker killed while storing
+# a page, and are removed by eviction
+PAGE_CACHE_TMP_MAX_AGE = 3600
+
+
+def _page_path(doc_hash: str, page: int, dpi: int) -> Path:
+    """Return the cache location of a rendered page."""
+    return PAGE_CACHE_DIR / doc_hash / f"{page}_{dpi}.npy"
+
+
+def load_page(doc_hash: Optional[str], page: int, dpi: int) -> Optional[np.ndarray]:
+    """
+    Load a rendered page from the disk cache.
+
+    The array is memory-mapped copy-on-write, so callers may modify it without
+    touching the cached file.
+
+    Args:
+        doc_hash (str): The SHA-256 hash of the document.
+        page (int): The 1-based page number.
+        dpi (int): The resolution the page was rendered at.
+
+    Returns:
+        Optional[np.ndarray]: The cached page image, or None on a cache miss.
+    """
+    if not PAGE_CACHE_ENABLED or not doc_hash:
+        return None
+
+    path = _page_path(doc_hash, page, dpi)
+    try:
+        image = np.load(path, mmap_mode="c")
+        # Refresh the modification time so eviction treats the page as recently used
+        os.utime(path)
+        return image
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Discarding unreadable cached page {path}: {str(e)}")
+        path.unlink(missing_ok=True)
+        return None
+
+
+def store_page(doc_hash: Optional[str], page: int, dpi: int, image: np.ndarray) -> None:
+    """
+    Write a rendered page to the disk cache.
+
+    Args:
+        doc_hash (str): The SHA-256 hash of the document.
+        page (int): The 1-based page number.
+        dpi (int): The resolution the page was rendered at.
+        image (np.ndarray): The rendered page image.
+    """
+    if not PAGE_CACHE_ENABLED or not doc_hash:
+        return
+
+    path = _page_path(doc_hash, page, dpi)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial array
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp_file:
+            np.save(tmp_file, np.ascontiguousarray(image))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Could not cache rendered page {path}: {str(e)}")
+
+
+def evict_pages(max_bytes: int = PAGE_CACHE_MAX_BYTES) -> int:
+    """
+    Remove the least recently used pages until the cache fits in `max_bytes`,
+    and stale temporary files.
+
+    Args:
+        max_bytes (int): The maximum total size of the cache.
+
+    Returns:
+        int: The number of pages evicted.
+    """
+    if not PAGE_CACHE_ENABLED or not PAGE_CACHE_DIR.is_dir():
+        return 0
+
+    stale_before = time.time() - PAGE_CACHE_TMP_MAX_AGE
+    for path in PAGE_CACHE_DIR.glob("*/*.tmp"):
+        try:
+            if path.stat().st_mtime < stale_before:
+                path.unlink()
+                logger.info(f"Removed stale temporary file {path} from the page cache.")
+        except FileNotFoundError:
+            continue
+        try:
+            path.parent.rmdir()
+        except OSError:
+            pass
+
+    entries = []
+    total_bytes = 0
+    for path in PAGE_CACHE_DIR.glob("*/*.npy"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total_bytes += stat.st_size
+
+    evicted = 0
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total_bytes -= size
+        evicted += 1
+        # Drop the per-document directory once it is empty
+        try:
+            path.parent.rmdir()
+        except OSError:
+            pass
+
+    if evicted:
+        logger.info(f"Evicted {evicted} page(s) from the page cache.")
+    return evicted
@@ -1,27 +1,248 @@
+import os
+import subprocess
+import time
 import cv2
 import numpy as np
-from pdf2image import convert_from_path
-from typing import List, Optional
+from pdf2image import convert_from_path, pdfinfo_from_path
+from typing import Iterable, Iterator, List, Optional, Tuple
 from app.core.logging_config import logger
+from app.core.metrics import page_cache_total, stage_seconds
+from app.service.doc_loader.page_cache import evict_pages, load_page, store_page
 
+# Rendering resolution, the number of pages rasterized per window and the
+# number of poppler processes a window is split across
+PDF_DPI = int(os.getenv("PDF_DPI", "200"))
+PDF_PAGE_WINDOW = int(os.getenv("PDF_PAGE_WINDOW", "4"))
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "1"))
 
-def pdf_to_images(pdf_path: str) -> List[np.ndarray]:
+# Optional lower resolution used for segmentation only. When set, detected
+# regions are re-rendered at PDF_DPI for prediction.
+PDF_SEGMENT_DPI = int(os.getenv("PDF_SEGMENT_DPI", "0")) or None
+
+
+def get_page_count(pdf_path: str) -> int:
+    """
+    Return the number of pages in a PDF without rasterizing it.
+
+    Args:
+        pdf_path (str): The file path to the PDF document.
+
+    Returns:
+        int: The page count, or 0 if the document cannot be read.
+    """
+    try:
+        return int(pdfinfo_from_path(pdf_path)["Pages"])
+    except Exception as e:
+        logger.error(f"Could not read page count for '{pdf_path}': {str(e)}")
+        return 0
+
+
+def render_pages(
+    pdf_path: str,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+    dpi: int = PDF_DPI,
+    workers: int = PDF_RENDER_WORKERS,
+) -> List[np.ndarray]:
+    """
+    Rasterize a contiguous page range of a PDF (the whole document by default).
+
+    The range is split across `workers` poppler processes.
+
+    Args:
+        pdf_path (str): The file path to the PDF document.
+        first_page (int, optional): First page to render (1-based, inclusive).
+        last_page (int, optional): Last page to render (1-based, inclusive).
+        dpi (int): The rendering resolution.
+        workers (int): The number of poppler processes to render with.
+
+    Returns:
+        List[np.ndarray]: The BGR page images, in page order.
+    """
+    pil_images = convert_from_path(
+        pdf_path,
+        dpi=dpi,
+        first_page=first_page,
+        last_page=last_page,
+        thread_count=max(workers, 1),
+    )
+    return [cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR) for image in pil_images]
+
+
+def render_region(
+    pdf_path: str,
+    page: int,
+    box: Tuple[int, int, int, int],
+    dpi: int = PDF_DPI,
+) -> Optional[np.ndarray]:
+    """
+    Rasterize a single rectangular region of a page.
+
+    Only the requested region is rendered by poppler, which is much cheaper
+    than rendering the whole page at a high resolution.
+
+    Args:
+        pdf_path (str): The file path to the PDF document.
+        page (int): The 1-based page number.
+        box (Tuple[int, int, int, int]): The region as (y0, x0, y1, x1) in
+            pixels at `dpi`.
+        dpi (int): The rendering resolution.
+
+    Returns:
+        Optional[np.ndarray]: The BGR region image, or None if rendering fails.
+    """
+    y0, x0, y1, x1 = box
+    command = [
+        "pdftoppm",
+        "-f", str(page),
+        "-l", str(page),
+        "-r", str(dpi),
+        "-x", str(x0),
+        "-y", str(y0),
+        "-W", str(x1 - x0),
+        "-H", str(y1 - y0),
+        "-singlefile",
+        pdf_path,
+    ]
+    try:
+        output = subprocess.run(command, capture_output=True, check=True).stdout
+        return cv2.imdecode(np.frombuffer(output, dtype=np.uint8), cv2.IMREAD_COLOR)
+    except Exception as e:
+        logger.error(f"An error occurred while rendering a region of page {page}: {str(e)}")
+        return None
+
+
+def _contiguous_runs(pages: List[int]) -> List[Tuple[int, int]]:
+    """Split a sorted list of page numbers into (first, last) runs of consecutive pages."""
+    runs = []
+    for page in pages:
+        if runs and page == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
+
+
+def iter_pdf_pages(
+    pdf_path: str,
+    dpi: int = PDF_DPI,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+    window: int = PDF_PAGE_WINDOW,
+    doc_hash: Optional[str] = None,
+    workers: int = PDF_RENDER_WORKERS,
+    pages: Optional[Iterable[int]] = None,
+    failed_pages: Optional[List[int]] = None,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Lazily rasterize the pages of a PDF, a bounded window of pages at a time.
+
+    Only one window of pages is held in memory at once, so peak memory does not
+    grow with the length of the document. When `doc_hash` is given, rendered
+    pages are read from and written to the disk page cache, and poppler is only
+    invoked for pages that are not cached yet.
+
+    Args:
+        pdf_path (str): The file path to the PDF document.
+        dpi (int): The rendering resolution.
+        first_page (int, optional): First page to render (1-based, inclusive).
+        last_page (int, optional): Last page to render (1-based, inclusive).
+        window (int): The number of pages rendered per window.
+        doc_hash (str, optional): The document hash used as the page cache key.
+        workers (int): The number of poppler processes a window is split across.
+        pages (Iterable[int], optional): Render only these pages (1-based)
+            within the page range.
+        failed_pages (List[int], optional): Receives the pages that could not
+            be rendered, which are not yielded. Callers must not treat the
+            document as complete when it is non-empty.
+
+    Yields:
+        Tuple[int, np.ndarray]: The 1-based page number and the BGR page image.
+    """
+    page_count = get_page_count(pdf_path)
+    if page_count == 0:
+        return
+
+    start = max(first_page or 1, 1)
+    end = min(last_page or page_count, page_count)
+    selected = sorted(
+        page for page in set(pages if pages is not None else range(start, end + 1))
+        if start <= page <= end
+    )
+    # A window smaller than the worker count would leave processes idle
+    window = max(window, workers, 1)
+
+    logger.info(
+        f"Streaming {len(selected)} page(s) of PDF '{pdf_path}' at {dpi} DPI "
+        f"({window} page(s) per window, {workers} worker(s))..."
+    )
+    cache_hits = 0
+    for window_index in range(0, len(selected), window):
+        window_pages = selected[window_index:window_index + window]
+        images = {page: load_page(doc_hash, page, dpi) for page in window_pages}
+        missing = [page for page in window_pages if images[page] is None]
+        cache_hits += len(window_pages) - len(missing)
+        if doc_hash:
+            page_cache_total.labels(result="hit").inc(len(window_pages) - len(missing))
+            page_cache_total.labels(result="miss").inc(len(missing))
+
+        for run_first, run_last in _contiguous_runs(missing):
+            try:
+                render_start = time.perf_counter()
+                rendered = render_pages(
+                    pdf_path, run_first, run_last, dpi=dpi, workers=workers
+                )
+            except Exception as e:
+                logger.error(
+                    f"An error occurred while rendering pages {run_first}-{run_last}: {str(e)}"
+                )
+                continue
+            seconds_per_page = (time.perf_counter() - render_start) / max(len(rendered), 1)
+            for offset, image in enumerate(rendered):
+                stage_seconds.labels(stage="rasterize").observe(seconds_per_page)
+                page = run_first + offset
+                images[page] = image
+                store_page(doc_hash, page, dpi, image)
+
+        unrendered = [page for page in window_pages if images[page] is None]
+        if unrendered:
+            logger.error(f"Could not render page(s) {unrendered} of PDF '{pdf_path}'")
+            if failed_pages is not None:
+                failed_pages.extend(unrendered)
+
+        for page in window_pages:
+            if images[page] is not None:
+                yield page, images[page]
+        del images
+
+    if doc_hash:
+        logger.info(f"Page cache hits: {cache_hits}/{len(selected)}")
+        evict_pages()
+
+
+def pdf_to_images(
+    pdf_path: str,
+    dpi: int = PDF_DPI,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+) -> List[np.ndarray]:
     """
     Convert each page of a PDF to a numpy array.
 
+    Prefer `iter_pdf_pages` for long documents; this keeps every page in memory.
+
     Args:
         pdf_path (str): The file path to the PDF document.
+        dpi (int): The rendering resolution.
+        first_page (int, optional): First page to render (1-based, inclusive).
+        last_page (int, optional): Last page to render (1-based, inclusive).
 
     Returns:
         List[np.ndarray]: A list of numpy arrays, each representing a page of the PDF.
     """
     try:
-        # Convert PDF pages to PIL images
         logger.info(f"Converting PDF '{pdf_path}' to images...")
-        pil_images = convert_from_path(pdf_path)
-
-        # Convert each PIL image to a numpy array
-        page_images = [cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR) for image in pil_images]
+        page_images = render_pages(pdf_path, first_page, last_page, dpi=dpi)
 
         logger.info(f"Successfully converted {len(page_images)} pages.")
         return page_images
@@ -31,4 +252,4 @@ def pdf_to_images(pdf_path: str) -> List[np.ndarray]:
         return []
     except Exception as e:
         logger.error(f"An error occurred during PDF to image conversion: {str(e)}")
-        return []
\ No newline at end of file
+        return []
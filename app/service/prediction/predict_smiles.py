@@ -3,19 +3,24 @@ from DECIMER import predict_SMILES
 from PIL import Image
 import io
 from app.core.logging_config import logger
-from typing import Tuple, Optional
+from app.core.metrics import predictions_total
+from typing import Callable, List, Tuple, Optional
 
 from app.service.prediction.calculate_confidence import calculate_overall_confidence
+from app.service.prediction.prediction_cache import (
+    SMILES_CACHE_ENABLED,
+    cache_prediction,
+    get_cached_prediction,
+    segment_cache_key,
+)
 
-def predict_smiles_from_segment(segment: np.ndarray) -> Optional[Tuple[str, float]]:
-    """
-    Predict a SMILES string and its confidence score from a single segmented chemical structure.
 
-    Args:
-        segment (np.ndarray): A segmented image (numpy array).
-
-    Returns:
-        Optional[Tuple[str, float]]: The predicted SMILES string and confidence score, or None if prediction fails.
+def _predict_segment(
+    segment: np.ndarray,
+) -> Optional[Tuple[str, float, List[Tuple[str, float]]]]:
+    """
+    Predict a SMILES string, its confidence score and the per-token
+    confidences from a single segmented chemical structure.
     """
     if not isinstance(segment, np.ndarray):
         logger.error("Input segment is not a numpy ndarray.")
@@ -39,7 +44,7 @@ def predict_smiles_from_segment(segment: np.ndarray) -> Optional[Tuple[str, floa
             
         if smiles:
             logger.info(f"Decoded SMILES: {smiles} with confidence: {confidence}")
-            return smiles, confidence
+            return smiles, confidence, actual_result[1]
         else:
             logger.warning("No SMILES decoded.")
             return None
@@ -47,3 +52,69 @@ def predict_smiles_from_segment(segment: np.ndarray) -> Optional[Tuple[str, floa
     except Exception as e:
         logger.error(f"Error during SMILES prediction: {str(e)}", exc_info=True)
         return None
+
+
+def predict_smiles_from_segment(segment: np.ndarray) -> Optional[Tuple[str, float]]:
+    """
+    Predict a SMILES string and its confidence score from a single segmented chemical structure.
+
+    Args:
+        segment (np.ndarray): A segmented image (numpy array).
+
+    Returns:
+        Optional[Tuple[str, float]]: The predicted SMILES string and confidence score, or None if prediction fails.
+    """
+    prediction = _predict_segment(segment)
+    return prediction[:2] if prediction else None
+
+
+def predict_smiles_from_segments(
+    segments: List[np.ndarray],
+    use_cache: bool = True,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Optional[Tuple[str, float]]]:
+    """
+    Predict SMILES strings and confidence scores for many segments.
+
+    Each segment is first looked up in the prediction cache by its pixels.
+    The remaining segments are predicted one at a time, since the exported
+    DECIMER model takes a single image, and their predictions are added to
+    the cache.
+
+    Args:
+        segments (List[np.ndarray]): Segmented images (numpy arrays).
+        use_cache (bool): Whether to read from and write to the prediction cache.
+        on_progress (Callable[[int, int], None], optional): Called with the
+            number of segments predicted so far and the total, after the cache
+            lookup and after each prediction.
+
+    Returns:
+        List[Optional[Tuple[str, float]]]: The predicted SMILES string and
+        confidence score for each segment, or None where prediction fails.
+    """
+    keys: List[Optional[str]] = [None] * len(segments)
+    predictions: List[Optional[Tuple[str, float]]] = [None] * len(segments)
+    if use_cache and SMILES_CACHE_ENABLED:
+        keys = [segment_cache_key(segment) for segment in segments]
+        predictions = [get_cached_prediction(key) for key in keys]
+
+    pending = [index for index, prediction in enumerate(predictions) if prediction is None]
+    if len(pending) < len(segments):
+        logger.info(f"Prediction cache hits: {len(segments) - len(pending)}/{len(segments)}")
+
+    done = len(segments) - len(pending)
+    if on_progress:
+        on_progress(done, len(segments))
+    for index in pending:
+        prediction = _predict_segment(segments[index])
+        predictions_total.labels(source="model").inc()
+        if prediction is not None:
+            smiles, confidence, token_confidences = prediction
+            predictions[index] = (smiles, confidence)
+            if keys[index] is not None:
+                cache_prediction(keys[index], smiles, confidence, token_confidences)
+        done += 1
+        if on_progress:
+            on_progress(done, len(segments))
+
+    return predictions
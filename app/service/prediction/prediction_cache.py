@@ -0,0 +1,147 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.logging_config import logger
+from app.core.metrics import predictions_total
+from app.repositories.smiles_cache import (
+    delete_stale_predictions_sync,
+    ensure_smiles_cache_indexes_sync,
+    get_cached_prediction_sync,
+    save_cached_prediction_sync,
+)
+from app.service.prediction.preprocess import normalize_segment
+
+# Two-level cache of SMILES predictions keyed by segment pixels: an in-process
+# LRU in front of a MongoDB collection shared by every worker
+SMILES_CACHE_ENABLED = os.getenv("SMILES_CACHE_ENABLED", "True").lower() == "true"
+SMILES_CACHE_SIZE = int(os.getenv("SMILES_CACHE_SIZE", "4096"))
+SMILES_CACHE_TTL_DAYS = int(os.getenv("SMILES_CACHE_TTL_DAYS", "90"))
+
+# Segments are normalised to this size before hashing, so re-renders of the
+# same drawing at slightly different scales share a key
+SMILES_CACHE_KEY_SIZE = 128
+
+
+def _get_model_version() -> str:
+    """Return the installed DECIMER version, used to invalidate the cache."""
+    try:
+        from importlib.metadata import version
+
+        return f"decimer-{version('decimer')}"
+    except Exception:
+        return "decimer-unknown"
+
+
+MODEL_VERSION = _get_model_version()
+
+_memory_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_stats = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "evictions": 0}
+_mongo_initialized = False
+
+
+def _init_mongo_cache():
+    """Create indexes and drop entries from other model versions, once per process."""
+    global _mongo_initialized
+    if _mongo_initialized:
+        return
+    _mongo_initialized = True
+    ensure_smiles_cache_indexes_sync(SMILES_CACHE_TTL_DAYS * 24 * 3600)
+    deleted = delete_stale_predictions_sync(MODEL_VERSION)
+    if deleted:
+        logger.info(f"Invalidated {deleted} cached predictions from other DECIMER versions.")
+
+
+def segment_cache_key(segment: np.ndarray) -> str:
+    """
+    Compute the cache key of a segment from its normalised pixels.
+
+    Args:
+        segment (np.ndarray): A segmented image (numpy array).
+
+    Returns:
+        str: The SHA-256 hash of the normalised segment.
+    """
+    normalized = normalize_segment(segment, SMILES_CACHE_KEY_SIZE)
+    return hashlib.sha256(normalized.tobytes()).hexdigest()
+
+
+def _remember(key: str, entry: Dict[str, Any]):
+    """Insert an entry into the in-process LRU, evicting the oldest if full."""
+    _memory_cache[key] = entry
+    _memory_cache.move_to_end(key)
+    while len(_memory_cache) > SMILES_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+        _cache_stats["evictions"] += 1
+
+
+def get_cached_prediction(key: str) -> Optional[Tuple[str, float]]:
+    """
+    Look up a prediction in the in-process cache, then in MongoDB.
+
+    Args:
+        key (str): The segment cache key.
+
+    Returns:
+        Optional[Tuple[str, float]]: The cached SMILES string and confidence
+        score, or None on a miss.
+    """
+    if not SMILES_CACHE_ENABLED:
+        return None
+
+    entry = _memory_cache.get(key)
+    if entry is not None:
+        _memory_cache.move_to_end(key)
+        _cache_stats["memory_hits"] += 1
+        predictions_total.labels(source="memory_cache").inc()
+        return entry["predicted_smiles"], entry["confidence"]
+
+    _init_mongo_cache()
+    entry = get_cached_prediction_sync(key, MODEL_VERSION)
+    if entry is not None:
+        _remember(key, entry)
+        _cache_stats["mongo_hits"] += 1
+        predictions_total.labels(source="mongo_cache").inc()
+        return entry["predicted_smiles"], entry["confidence"]
+
+    _cache_stats["misses"] += 1
+    return None
+
+
+def cache_prediction(
+    key: str,
+    smiles: str,
+    confidence: float,
+    token_confidences: Optional[List[Tuple[str, float]]] = None,
+):
+    """
+    Store a prediction in both cache levels.
+
+    Args:
+        key (str): The segment cache key.
+        smiles (str): The predicted SMILES string.
+        confidence (float): The overall confidence score.
+        token_confidences (List[Tuple[str, float]], optional): The per-token
+            confidences reported by DECIMER.
+    """
+    if not SMILES_CACHE_ENABLED:
+        return
+
+    entry = {
+        "key": key,
+        "model_version": MODEL_VERSION,
+        "predicted_smiles": smiles,
+        "confidence": float(confidence),
+        "token_confidences": [
+            [str(token), float(value)] for token, value in (token_confidences or [])
+        ],
+    }
+    _remember(key, entry)
+    _init_mongo_cache()
+    save_cached_prediction_sync(dict(entry))
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return the hit, miss and eviction counters of this process."""
+    return dict(_cache_stats)
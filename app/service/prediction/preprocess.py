@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+
+# Normalisation of segments for comparing their pixels (the prediction cache
+# key and near-duplicate grouping). Model inputs are still prepared by
+# DECIMER's own `decode_image`.
+
+# Pixels brighter than this are treated as background when trimming borders
+BACKGROUND_THRESHOLD = 250
+
+
+def _to_grayscale(segment: np.ndarray) -> np.ndarray:
+    """Convert a BGR, BGRA or grayscale segment to grayscale, flattening
+    transparency onto a white background."""
+    if segment.ndim == 2:
+        return segment
+    if segment.shape[2] == 4:
+        alpha = segment[:, :, 3:4].astype(np.float32) / 255.0
+        segment = (segment[:, :, :3] * alpha + 255.0 * (1.0 - alpha)).astype(np.uint8)
+    return cv2.cvtColor(segment, cv2.COLOR_BGR2GRAY)
+
+
+def _stretch_contrast(gray: np.ndarray) -> np.ndarray:
+    """Stretch the intensity range of a grayscale image to 0-255."""
+    low, high = int(gray.min()), int(gray.max())
+    if high <= low:
+        return gray
+    return ((gray.astype(np.float32) - low) * (255.0 / (high - low))).astype(np.uint8)
+
+
+def _trim_and_square(gray: np.ndarray) -> np.ndarray:
+    """Remove empty borders and pad the drawing to a centred white square."""
+    ink_rows = np.flatnonzero((gray < BACKGROUND_THRESHOLD).any(axis=1))
+    ink_cols = np.flatnonzero((gray < BACKGROUND_THRESHOLD).any(axis=0))
+    if ink_rows.size and ink_cols.size:
+        gray = gray[ink_rows[0]:ink_rows[-1] + 1, ink_cols[0]:ink_cols[-1] + 1]
+
+    height, width = gray.shape
+    side = max(height, width)
+    top = (side - height) // 2
+    left = (side - width) // 2
+    return cv2.copyMakeBorder(
+        gray, top, side - height - top, left, side - width - left,
+        cv2.BORDER_CONSTANT, value=255,
+    )
+
+
+def normalize_segment(segment: np.ndarray, size: int) -> np.ndarray:
+    """
+    Normalise a segment to a trimmed, centred, grayscale square of `size` pixels.
+
+    Args:
+        segment (np.ndarray): A segmented image (numpy array).
+        size (int): The side length of the output.
+
+    Returns:
+        np.ndarray: A uint8 array of shape (size, size).
+    """
+    square = _trim_and_square(_stretch_contrast(_to_grayscale(segment)))
+    interpolation = cv2.INTER_AREA if square.shape[0] > size else cv2.INTER_CUBIC
+    return cv2.resize(square, (size, size), interpolation=interpolation)
@@ -0,0 +1,111 @@
+import os
+from typing import List
+import cv2
+import numpy as np
+from app.service.prediction.preprocess import normalize_segment
+
+# Grouping copies one prediction to every member of a group, so a false
+# merge silently gives a structure another molecule's SMILES. It is opt-in.
+SEGMENT_CLUSTER_ENABLED = os.getenv("SEGMENT_CLUSTER_ENABLED", "False").lower() == "true"
+
+# Maximum Hamming distance between the 64-bit perceptual hashes of two
+# segments, and maximum relative aspect ratio difference, for them to be
+# candidates for the same drawing
+SEGMENT_CLUSTER_MAX_DISTANCE = int(os.getenv("SEGMENT_CLUSTER_MAX_DISTANCE", "4"))
+SEGMENT_CLUSTER_MAX_ASPECT_DIFF = 0.2
+
+# A 32 px hash cannot tell apart molecules that differ by one substituent, so
+# candidates are confirmed on their ink at this size: at most this fraction of
+# the ink pixels of either may lack ink within one pixel in the other. An
+# atom label swap (Cl/Br, OH/NH2) leaves about 2% unmatched, so by default
+# only drawings whose ink matches everywhere are grouped. Measure false
+# merges with batch/bench_cluster.py on labelled pairs before raising it.
+SEGMENT_CLUSTER_CONFIRM_SIZE = 128
+SEGMENT_CLUSTER_MAX_PIXEL_DIFF = float(os.getenv("SEGMENT_CLUSTER_MAX_PIXEL_DIFF", "0"))
+
+
+def perceptual_hash(segment: np.ndarray) -> int:
+    """
+    Compute a 64-bit DCT perceptual hash of a segment.
+
+    The segment is normalised to a small square, and the sign of its lowest
+    frequency DCT coefficients relative to their median forms the hash, so
+    small rendering differences barely change it.
+
+    Args:
+        segment (np.ndarray): A segmented image (numpy array).
+
+    Returns:
+        int: The perceptual hash.
+    """
+    small = normalize_segment(segment, 32).astype(np.float32)
+    low_frequencies = cv2.dct(small)[:8, :8].flatten()
+    bits = low_frequencies > np.median(low_frequencies[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def ink_mask(segment: np.ndarray, size: int = SEGMENT_CLUSTER_CONFIRM_SIZE) -> np.ndarray:
+    """Return the ink pixels of a segment normalised to a `size` pixel square."""
+    return normalize_segment(segment, size) < 128
+
+
+def pixel_difference(ink_a: np.ndarray, ink_b: np.ndarray) -> float:
+    """
+    Return the fraction of the ink pixels of two masks with no ink within one
+    pixel in the other mask, tolerating small rendering shifts.
+    """
+    kernel = np.ones((3, 3), np.uint8)
+    near_a = cv2.dilate(ink_a.astype(np.uint8), kernel).astype(bool)
+    near_b = cv2.dilate(ink_b.astype(np.uint8), kernel).astype(bool)
+    unmatched = np.count_nonzero(ink_a & ~near_b) + np.count_nonzero(ink_b & ~near_a)
+    total = np.count_nonzero(ink_a) + np.count_nonzero(ink_b)
+    return unmatched / float(total) if total else 0.0
+
+
+def _aspect_ratio(segment: np.ndarray) -> float:
+    height, width = segment.shape[:2]
+    return width / float(max(height, 1))
+
+
+def cluster_segments(
+    segments: List[np.ndarray], max_distance: int = SEGMENT_CLUSTER_MAX_DISTANCE
+) -> List[int]:
+    """
+    Group near-identical segments.
+
+    Each segment is compared against the representatives found so far and
+    joins the first one within `max_distance` bits with a similar aspect ratio
+    whose ink also matches at `SEGMENT_CLUSTER_CONFIRM_SIZE` pixels; otherwise
+    it becomes a new representative.
+
+    Args:
+        segments (List[np.ndarray]): Segmented images (numpy arrays).
+        max_distance (int): The maximum Hamming distance between hashes.
+
+    Returns:
+        List[int]: For each segment, the index of its group representative.
+            Representatives map to their own index.
+    """
+    if not SEGMENT_CLUSTER_ENABLED:
+        return list(range(len(segments)))
+
+    representatives = []  # (index, hash, aspect ratio, ink mask)
+    assignment = []
+    for index, segment in enumerate(segments):
+        segment_hash = perceptual_hash(segment)
+        aspect = _aspect_ratio(segment)
+        ink = ink_mask(segment)
+        for rep_index, rep_hash, rep_aspect, rep_ink in representatives:
+            close_hash = bin(segment_hash ^ rep_hash).count("1") <= max_distance
+            close_aspect = abs(aspect - rep_aspect) <= SEGMENT_CLUSTER_MAX_ASPECT_DIFF * rep_aspect
+            if (
+                close_hash
+                and close_aspect
+                and pixel_difference(ink, rep_ink) <= SEGMENT_CLUSTER_MAX_PIXEL_DIFF
+            ):
+                assignment.append(rep_index)
+                break
+        else:
+            representatives.append((index, segment_hash, aspect, ink))
+            assignment.append(index)
+    return assignment
@@ -0,0 +1,116 @@
+import os
+from typing import Tuple
+import cv2
+import numpy as np
+from app.core.logging_config import logger
+
+# Pages are classified at low resolution; the thresholds below are tuned for
+# that size and err on the side of keeping a page. Off by default until its
+# recall has been measured with batch/bench_page_filter.py on a labelled set.
+PAGE_FILTER_ENABLED = os.getenv("PAGE_FILTER_ENABLED", "False").lower() == "true"
+PAGE_FILTER_MAX_SIDE = int(os.getenv("PAGE_FILTER_MAX_SIDE", "512"))
+PAGE_FILTER_MIN_INK = float(os.getenv("PAGE_FILTER_MIN_INK", "0.002"))
+PAGE_FILTER_MAX_MIDTONE = float(os.getenv("PAGE_FILTER_MAX_MIDTONE", "0.6"))
+PAGE_FILTER_MIN_DIAGONAL_LINES = int(os.getenv("PAGE_FILTER_MIN_DIAGONAL_LINES", "4"))
+
+
+def _downscale_gray(image: np.ndarray, max_side: int) -> np.ndarray:
+    """Convert a page to grayscale and shrink it so its longest side is `max_side`."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    scale = max_side / max(gray.shape[:2])
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def _normalize_background(gray: np.ndarray) -> np.ndarray:
+    """
+    Map a page onto a white background with dark ink.
+
+    The background is estimated as the most common gray level, and each pixel
+    becomes its distance from it, so slides with a coloured, gray or dark
+    template background look like ink on paper.
+    """
+    background = int(np.bincount(gray.ravel(), minlength=256).argmax())
+    distance = np.abs(gray.astype(np.int16) - background)
+    return (255 - distance).astype(np.uint8)
+
+
+def _count_diagonal_lines(binary: np.ndarray) -> int:
+    """
+    Count short straight segments that are neither horizontal nor vertical.
+
+    Bonds in skeletal formulas are drawn at roughly 30 and 60 degrees, while
+    text and table rules produce almost exclusively axis-aligned segments.
+    """
+    min_length = max(binary.shape) // 64
+    lines = cv2.HoughLinesP(
+        binary, 1, np.pi / 180, threshold=15, minLineLength=min_length, maxLineGap=2
+    )
+    if lines is None:
+        return 0
+
+    x1, y1, x2, y2 = lines[:, 0].T.astype(np.float64)
+    angles = np.degrees(np.arctan2(np.abs(y2 - y1), np.abs(x2 - x1)))
+    return int(np.count_nonzero((angles > 15) & (angles < 75)))
+
+
+def _has_sparse_drawing(binary: np.ndarray) -> bool:
+    """
+    Look for large connected components with a low fill ratio.
+
+    Line drawings span a large bounding box with few ink pixels, unlike text
+    glyphs (small) or filled shapes and logos (dense).
+    """
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    min_side = max(binary.shape) * 0.05
+    for x, y, w, h, area in stats[1:count]:
+        if max(w, h) >= min_side and area / float(w * h) < 0.25:
+            return True
+    return False
+
+
+def page_may_contain_structures(image: np.ndarray) -> Tuple[bool, str]:
+    """
+    Cheaply decide whether a rendered page could contain a chemical structure.
+
+    Blank pages, photos and text-only pages are rejected so they never reach
+    the segmentation model.
+
+    Args:
+        image (np.ndarray): The rendered page (BGR or grayscale).
+
+    Returns:
+        Tuple[bool, str]: Whether the page should be segmented and the reason.
+    """
+    if not PAGE_FILTER_ENABLED:
+        return True, "Page filter disabled"
+
+    try:
+        # Measure ink and mid-tones relative to the page background, so that
+        # template backgrounds are not mistaken for photos or ink
+        gray = _normalize_background(_downscale_gray(image, PAGE_FILTER_MAX_SIDE))
+
+        midtone_ratio = np.count_nonzero((gray > 40) & (gray < 215)) / gray.size
+        if midtone_ratio > PAGE_FILTER_MAX_MIDTONE:
+            return False, f"Photographic page (mid-tone ratio {midtone_ratio:.2f})"
+
+        ink_density = np.count_nonzero(gray < 128) / gray.size
+        if ink_density < PAGE_FILTER_MIN_INK:
+            return False, f"Blank page (ink density {ink_density:.4f})"
+
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+        diagonal_lines = _count_diagonal_lines(binary)
+        if diagonal_lines >= PAGE_FILTER_MIN_DIAGONAL_LINES:
+            return True, f"Found {diagonal_lines} diagonal line segments"
+
+        if diagonal_lines > 0 and _has_sparse_drawing(binary):
+            return True, "Found a sparse line drawing"
+
+        return False, f"No line drawings found ({diagonal_lines} diagonal line segments)"
+
+    except Exception as e:
+        # Never lose a page because of a pre-filter failure
+        logger.error(f"An error occurred during page pre-filtering: {str(e)}")
+        return True, "Page filter failed"
@@ -1,7 +1,9 @@
-from typing import List
+from typing import List, Tuple
+import cv2
 import numpy as np
-from decimer_segmentation import segment_chemical_structures
+from decimer_segmentation import get_expanded_masks, segment_chemical_structures
 from app.core.logging_config import logger
+from app.service.doc_loader.pdf_loader import render_region
 
 def segment_images(image: np.ndarray) -> List[np.ndarray]:
     """
@@ -22,3 +24,124 @@ def segment_images(image: np.ndarray) -> List[np.ndarray]:
     except Exception as e:
         logger.error(f"An error occurred during segmentation: {str(e)}")
         return []
+
+
+def segment_image_masks(image: np.ndarray) -> List[np.ndarray]:
+    """
+    Locate chemical structures in an image without keeping the crops.
+
+    `segment_chemical_structures` only returns the crops, so this runs the
+    same detection and mask expansion and keeps the masks instead.
+
+    Args:
+        image np.ndarray: The image to segment.
+
+    Returns:
+        List[np.ndarray]: One boolean mask of the image's size per structure,
+        ordered top to bottom, then left to right.
+    """
+    try:
+        logger.info(f"Starting segmentation on image (masks)...")
+        masks = get_expanded_masks(image)
+        masks = [masks[:, :, index].astype(bool) for index in range(masks.shape[2])]
+        masks = [mask for mask in masks if mask.any()]
+        masks.sort(key=lambda mask: mask_box(mask)[:2])
+        logger.info(f"Successfully located {len(masks)} structures.")
+        return masks
+
+    except Exception as e:
+        logger.error(f"An error occurred during segmentation: {str(e)}")
+        return []
+
+
+def mask_box(mask: np.ndarray) -> Tuple[int, int, int, int]:
+    """Return the (y0, x0, y1, x1) bounding box of a non-empty mask, exclusive of y1 and x1."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    return int(rows[0]), int(cols[0]), int(rows[-1]) + 1, int(cols[-1]) + 1
+
+
+def apply_region_mask(segment: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Whiten the pixels of a segment outside its structure mask, as
+    decimer_segmentation does for its own crops, so that neighbouring text and
+    structures do not end up in the prediction input. The mask is resized to
+    the segment, which may be at another resolution.
+    """
+    height, width = segment.shape[:2]
+    if mask.shape != (height, width):
+        mask = cv2.resize(
+            mask.astype(np.uint8), (width, height), interpolation=cv2.INTER_NEAREST
+        ).astype(bool)
+    segment = segment.copy()
+    segment[~mask] = 255
+    return segment
+
+
+def scale_box(
+    box: Tuple[int, int, int, int],
+    scale: float,
+    shape: Tuple[int, int],
+    padding: int = 0,
+) -> Tuple[int, int, int, int]:
+    """
+    Scale a (y0, x0, y1, x1) box to another resolution, pad it and clip it to
+    an image of the given (height, width).
+    """
+    y0, x0, y1, x1 = box
+    height, width = shape
+    return (
+        max(int(y0 * scale) - padding, 0),
+        max(int(x0 * scale) - padding, 0),
+        min(int(round(y1 * scale)) + padding, height),
+        min(int(round(x1 * scale)) + padding, width),
+    )
+
+
+def segment_images_rerendered(
+    image: np.ndarray,
+    pdf_path: str,
+    page: int,
+    segment_dpi: int,
+    render_dpi: int,
+    padding: int = 4,
+) -> List[np.ndarray]:
+    """
+    Segment a low resolution page and re-render the detected regions at a
+    higher resolution.
+
+    Segmentation cost scales with the page size, while prediction quality
+    depends on the resolution of the crops, so only the detected regions are
+    rendered at `render_dpi`. Each crop keeps only the pixels under its
+    structure's mask, like the crops of `segment_images`.
+
+    Args:
+        image (np.ndarray): The page rendered at `segment_dpi`.
+        pdf_path (str): The file path to the PDF document.
+        page (int): The 1-based page number.
+        segment_dpi (int): The resolution `image` was rendered at.
+        render_dpi (int): The resolution to render the segments at.
+        padding (int): Padding around each box, in `segment_dpi` pixels.
+
+    Returns:
+        List[np.ndarray]: The segmented chemical structures at `render_dpi`.
+    """
+    scale = render_dpi / segment_dpi
+    height, width = image.shape[:2]
+    render_shape = (int(height * scale), int(width * scale))
+    # Grow the masks by a pixel so that scaling them up does not clip the
+    # edges of the drawing
+    kernel = np.ones((3, 3), np.uint8)
+
+    segments = []
+    for mask in segment_image_masks(image):
+        mask = cv2.dilate(mask.astype(np.uint8), kernel).astype(bool)
+        y0, x0, y1, x1 = scale_box(mask_box(mask), 1.0, (height, width), padding=padding)
+        region_mask = mask[y0:y1, x0:x1]
+        render_box = scale_box((y0, x0, y1, x1), scale, render_shape)
+        segment = render_region(pdf_path, page, render_box, dpi=render_dpi)
+        if segment is None or segment.size == 0:
+            # Fall back to the low resolution crop rather than losing the structure
+            segment = image[y0:y1, x0:x1]
+        segments.append(apply_region_mask(segment, region_mask))
+    return segments
@@ -1,20 +1,42 @@
 import os
+import time
 import requests
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from dotenv import load_dotenv
 import json
 
+from app.core.metrics import daikon_request_seconds, daikon_requests_total
+from app.utils.daikon_cache import cached_call
 from app.utils.http_client import api_client
 
 # Load environment variables from a .env file (if available)
 load_dotenv()
 
+# Maximum number of concurrent lookups when resolving many molecules
+DAIKON_LOOKUP_WORKERS = int(os.getenv("DAIKON_LOOKUP_WORKERS", "8"))
+
 
 def remove_null_fields(data: Dict[str, Any]) -> Dict[str, Any]:
     """Remove fields that are None or null from the dictionary."""
     return {key: value for key, value in data.items() if value is not None}
 
 
+def _daikon_call(operation: str, **kwargs) -> Optional[Dict[str, Any]]:
+    """Call a Daikon API through `api_client`, recording its latency and outcome."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        response = api_client(**kwargs)
+        outcome = "success" if response is not None else "failure"
+        return response
+    finally:
+        daikon_requests_total.labels(operation=operation, outcome=outcome).inc()
+        daikon_request_seconds.labels(operation=operation).observe(
+            time.perf_counter() - start
+        )
+
+
 def get_molecule_by_smiles(smiles: str) -> Optional[Dict[str, Any]]:
     """
     Fetches a molecule's data using its SMILES string.
@@ -28,7 +50,60 @@ def get_molecule_by_smiles(smiles: str) -> Optional[Dict[str, Any]]:
     base_url = os.getenv("DAIKON_MLX_URL")
     endpoint = "/molecule/similar/"
     params = {"SMILES": smiles, "Threshold": 1, "Limit": 1, "WithMeta": "false"}
-    return api_client(base_url=base_url, endpoint=endpoint, params=params)
+    return cached_call(
+        "get_molecule_by_smiles",
+        smiles,
+        lambda: _daikon_call(
+            "get_molecule_by_smiles", base_url=base_url, endpoint=endpoint, params=params
+        ),
+    )
+
+
+def resolve_concurrently(
+    fetch: Callable[[str], Optional[Any]],
+    keys: Iterable[str],
+    max_workers: int = DAIKON_LOOKUP_WORKERS,
+) -> Dict[str, Optional[Any]]:
+    """
+    Call a Daikon lookup once per distinct key, concurrently.
+
+    Args:
+        fetch (Callable[[str], Optional[Any]]): The lookup, e.g. `get_horizon_target`.
+        keys (Iterable[str]): The keys (SMILES strings or IDs), possibly repeated.
+            Empty keys are ignored.
+        max_workers (int): The maximum number of requests in flight.
+
+    Returns:
+        Dict[str, Optional[Any]]: The JSON response for each distinct key, or
+        None where the lookup failed.
+    """
+    unique_keys = list(dict.fromkeys(key for key in keys if key))
+    if not unique_keys:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(min(max_workers, len(unique_keys)), 1)) as pool:
+        return dict(zip(unique_keys, pool.map(fetch, unique_keys)))
+
+
+def get_molecules_by_smiles(
+    smiles_list: List[str], max_workers: int = DAIKON_LOOKUP_WORKERS
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Fetches the molecule data of many SMILES strings.
+
+    Each distinct SMILES string is looked up once, and the lookups run
+    concurrently on a bounded thread pool. The MLX service only accepts one
+    SMILES string per request, so this is the single place to switch to a
+    batch request if it ever offers one.
+
+    Args:
+        smiles_list (List[str]): The SMILES strings, possibly repeated.
+        max_workers (int): The maximum number of requests in flight.
+
+    Returns:
+        Dict[str, Optional[Dict[str, Any]]]: The JSON response for each
+        distinct SMILES string, or None where the lookup failed.
+    """
+    return resolve_concurrently(get_molecule_by_smiles, smiles_list, max_workers)
 
 
 def get_document_by_path(path: str) -> Optional[Dict[str, Any]]:
@@ -44,7 +119,9 @@ def get_document_by_path(path: str) -> Optional[Dict[str, Any]]:
     base_url = os.getenv("DAIKON_DOC_URL")
     endpoint = "/docu-store/parsed-docs/by-path"
     params = {"Path": path}
-    return api_client(base_url=base_url, endpoint=endpoint, params=params)
+    return _daikon_call(
+        "get_document_by_path", base_url=base_url, endpoint=endpoint, params=params
+    )
 
 
 def get_horizon_associations(id: str) -> Optional[Dict[str, Any]]:
@@ -61,7 +138,13 @@ def get_horizon_associations(id: str) -> Optional[Dict[str, Any]]:
     base_url = os.getenv("DAIKON_HORIZON_URL")
     endpoint = f"/horizon/find-molecule-relations/{id}"
     params = {"id": id}
-    return api_client(base_url=base_url, endpoint=endpoint, params=params)
+    return cached_call(
+        "get_horizon_associations",
+        id,
+        lambda: _daikon_call(
+            "get_horizon_associations", base_url=base_url, endpoint=endpoint, params=params
+        ),
+    )
 
 
 def get_horizon_target(id: str) -> Optional[Dict[str, Any]]:
@@ -78,7 +161,13 @@ def get_horizon_target(id: str) -> Optional[Dict[str, Any]]:
     base_url = os.getenv("DAIKON_HORIZON_URL")
     endpoint = f"/horizon/find-target/{id}"
     params = {"id": id}
-    return api_client(base_url=base_url, endpoint=endpoint, params=params)
+    return cached_call(
+        "get_horizon_target",
+        id,
+        lambda: _daikon_call(
+            "get_horizon_target", base_url=base_url, endpoint=endpoint, params=params
+        ),
+    )
 
 def add_or_update_document(document_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
@@ -98,7 +187,8 @@ def add_or_update_document(document_data: Dict[str, Any]) -> Optional[Dict[str,
     #print(f"Payload: {serialized_data}")  # Debug the payload
 
     # Call the API client
-    return api_client(
+    return _daikon_call(
+        "add_or_update_document",
         base_url=base_url,
         endpoint=endpoint,
         method="PUT",
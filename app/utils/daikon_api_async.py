@@ -0,0 +1,191 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from dotenv import load_dotenv
+
+from app.core.metrics import daikon_request_seconds, daikon_requests_total
+from app.utils.daikon_api import DAIKON_LOOKUP_WORKERS, remove_null_fields
+from app.utils.daikon_cache import cached_call_async, close_async_redis
+from app.utils.http_client_async import api_client, close_clients
+
+# Load environment variables from a .env file (if available)
+load_dotenv()
+
+# The async counterparts of the functions in app.utils.daikon_api, for the
+# API and async hooks. Same endpoints, response cache and metrics.
+
+
+async def _daikon_call(operation: str, **kwargs) -> Optional[Dict[str, Any]]:
+    """Call a Daikon API through the async `api_client`, recording its latency and outcome."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        response = await api_client(**kwargs)
+        outcome = "success" if response is not None else "failure"
+        return response
+    finally:
+        daikon_requests_total.labels(operation=operation, outcome=outcome).inc()
+        daikon_request_seconds.labels(operation=operation).observe(
+            time.perf_counter() - start
+        )
+
+
+async def close_connections():
+    """Close the HTTP and Redis clients of the running loop."""
+    await close_clients()
+    await close_async_redis()
+
+
+async def get_molecule_by_smiles(smiles: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetches a molecule's data using its SMILES string.
+
+    Args:
+        smiles (str): The SMILES string representing the molecule.
+
+    Returns:
+        Optional[Dict[str, Any]]: The JSON response from the API, or None if an error occurs.
+    """
+    base_url = os.getenv("DAIKON_MLX_URL")
+    endpoint = "/molecule/similar/"
+    params = {"SMILES": smiles, "Threshold": 1, "Limit": 1, "WithMeta": "false"}
+    return await cached_call_async(
+        "get_molecule_by_smiles",
+        smiles,
+        lambda: _daikon_call(
+            "get_molecule_by_smiles", base_url=base_url, endpoint=endpoint, params=params
+        ),
+    )
+
+
+async def resolve_concurrently(
+    fetch: Callable[[str], Awaitable[Optional[Any]]],
+    keys: Iterable[str],
+    max_concurrency: int = DAIKON_LOOKUP_WORKERS,
+) -> Dict[str, Optional[Any]]:
+    """
+    Await a Daikon lookup once per distinct key, concurrently.
+
+    Args:
+        fetch (Callable[[str], Awaitable[Optional[Any]]]): The lookup, e.g. `get_horizon_target`.
+        keys (Iterable[str]): The keys (SMILES strings or IDs), possibly repeated.
+            Empty keys are ignored.
+        max_concurrency (int): The maximum number of lookups in flight.
+
+    Returns:
+        Dict[str, Optional[Any]]: The JSON response for each distinct key, or
+        None where the lookup failed.
+    """
+    unique_keys = list(dict.fromkeys(key for key in keys if key))
+    if not unique_keys:
+        return {}
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+    async def bounded_fetch(key: str):
+        async with semaphore:
+            return await fetch(key)
+
+    responses = await asyncio.gather(*(bounded_fetch(key) for key in unique_keys))
+    return dict(zip(unique_keys, responses))
+
+
+async def get_molecules_by_smiles(
+    smiles_list: List[str], max_concurrency: int = DAIKON_LOOKUP_WORKERS
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Fetches the molecule data of many SMILES strings, looking up each
+    distinct SMILES string once, concurrently.
+
+    Args:
+        smiles_list (List[str]): The SMILES strings, possibly repeated.
+        max_concurrency (int): The maximum number of lookups in flight.
+
+    Returns:
+        Dict[str, Optional[Dict[str, Any]]]: The JSON response for each
+        distinct SMILES string, or None where the lookup failed.
+    """
+    return await resolve_concurrently(get_molecule_by_smiles, smiles_list, max_concurrency)
+
+
+async def get_document_by_path(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetches a document's data using its path.
+
+    Args:
+        path (str): The path to the document.
+
+    Returns:
+        Optional[Dict[str, Any]]: The JSON response from the API, or None if an error occurs.
+    """
+    base_url = os.getenv("DAIKON_DOC_URL")
+    endpoint = "/docu-store/parsed-docs/by-path"
+    params = {"Path": path}
+    return await _daikon_call(
+        "get_document_by_path", base_url=base_url, endpoint=endpoint, params=params
+    )
+
+
+async def get_horizon_associations(id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetches the associations of a molecule using its ID.
+
+    Args:
+        id (str): The ID of the molecule.
+
+    Returns:
+        Optional[Dict[str, Any]]: The JSON response from the API, or None if an error occurs.
+    """
+    base_url = os.getenv("DAIKON_HORIZON_URL")
+    endpoint = f"/horizon/find-molecule-relations/{id}"
+    params = {"id": id}
+    return await cached_call_async(
+        "get_horizon_associations",
+        id,
+        lambda: _daikon_call(
+            "get_horizon_associations", base_url=base_url, endpoint=endpoint, params=params
+        ),
+    )
+
+
+async def get_horizon_target(id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetches the target of a Horizon relation using its ID.
+
+    Args:
+        id (str): The ID of the relation.
+
+    Returns:
+        Optional[Dict[str, Any]]: The JSON response from the API, or None if an error occurs.
+    """
+    base_url = os.getenv("DAIKON_HORIZON_URL")
+    endpoint = f"/horizon/find-target/{id}"
+    params = {"id": id}
+    return await cached_call_async(
+        "get_horizon_target",
+        id,
+        lambda: _daikon_call(
+            "get_horizon_target", base_url=base_url, endpoint=endpoint, params=params
+        ),
+    )
+
+
+async def add_or_update_document(document_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Adds or updates a document in the Daikon document store.
+
+    Args:
+        document_data (Dict[str, Any]): The document data to send.
+
+    Returns:
+        Optional[Dict[str, Any]]: The JSON response from the API, or None if an error occurs.
+    """
+    base_url = os.getenv("DAIKON_DOC_URL")
+    endpoint = "/docu-store/parsed-docs"
+    return await _daikon_call(
+        "add_or_update_document",
+        base_url=base_url,
+        endpoint=endpoint,
+        method="PUT",
+        data=remove_null_fields(document_data),
+    )
@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple
+import redis
+import redis.asyncio
+from app.core.logging_config import logger
+from app.core.metrics import daikon_cache_total
+
+# Read-through cache of Daikon GET responses: an in-process LRU in front of
+# Redis, shared by every worker and the API
+DAIKON_CACHE_ENABLED = os.getenv("DAIKON_CACHE_ENABLED", "True").lower() == "true"
+DAIKON_CACHE_SIZE = int(os.getenv("DAIKON_CACHE_SIZE", "2048"))
+DAIKON_CACHE_REDIS_URL = os.getenv(
+    "DAIKON_CACHE_REDIS_URL", os.getenv("REDIS_BROKER_URL", "redis://localhost:6379/0")
+)
+CACHE_PREFIX = "decimer:daikon:"
+
+# Time to live of a response, per operation, in seconds. Molecules rarely
+# change; Horizon relations are curated more often.
+DAIKON_CACHE_TTLS = {
+    "get_molecule_by_smiles": int(os.getenv("DAIKON_CACHE_TTL_MOLECULE", str(24 * 3600))),
+    "get_horizon_associations": int(os.getenv("DAIKON_CACHE_TTL_HORIZON", "3600")),
+    "get_horizon_target": int(os.getenv("DAIKON_CACHE_TTL_HORIZON", "3600")),
+}
+
+# Empty answers ("not found") are cached for a shorter time, so that a
+# molecule added to Daikon is picked up soon. Failed requests are not cached.
+DAIKON_CACHE_NEGATIVE_TTL = int(os.getenv("DAIKON_CACHE_NEGATIVE_TTL", "600"))
+
+_memory_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+_memory_lock = threading.Lock()
+_redis_client: Optional[redis.Redis] = None
+# Async clients are bound to the event loop they were created on
+_async_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.asyncio.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_redis() -> redis.Redis:
+    """Connect to Redis on first use."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(DAIKON_CACHE_REDIS_URL)
+    return _redis_client
+
+
+def _get_async_redis() -> redis.asyncio.Redis:
+    """Connect to Redis on first use on the running loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_redis_clients.get(loop)
+    if client is None:
+        client = _async_redis_clients[loop] = redis.asyncio.Redis.from_url(
+            DAIKON_CACHE_REDIS_URL
+        )
+    return client
+
+
+def _cache_key(operation: str, argument: str) -> str:
+    digest = hashlib.sha256(argument.encode()).hexdigest()
+    return f"{CACHE_PREFIX}{operation}:{digest}"
+
+
+def _memory_get(key: str) -> Tuple[bool, Any]:
+    with _memory_lock:
+        entry = _memory_cache.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del _memory_cache[key]
+            return False, None
+        _memory_cache.move_to_end(key)
+        return True, value
+
+
+def _memory_set(key: str, value: Any, ttl: int):
+    with _memory_lock:
+        _memory_cache[key] = (time.time() + ttl, value)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > DAIKON_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _cache_ttl(operation: str, argument: Optional[str]) -> Optional[int]:
+    """Return the TTL of an operation, or None if its response is not cached."""
+    if not DAIKON_CACHE_ENABLED or argument is None:
+        return None
+    return DAIKON_CACHE_TTLS.get(operation)
+
+
+def _store_ttl(value: Any, ttl: int) -> int:
+    return min(ttl, DAIKON_CACHE_NEGATIVE_TTL) if not value else ttl
+
+
+def _memory_lookup(operation: str, key: str) -> Tuple[bool, Any]:
+    found, value = _memory_get(key)
+    if found:
+        daikon_cache_total.labels(operation=operation, result="memory_hit").inc()
+    return found, value
+
+
+def _redis_hit(operation: str, key: str, payload: bytes, ttl: int) -> Any:
+    value = json.loads(payload)
+    _memory_set(key, value, ttl)
+    daikon_cache_total.labels(operation=operation, result="redis_hit").inc()
+    return value
+
+
+def cached_call(operation: str, argument: str, fetch: Callable[[], Any]) -> Any:
+    """
+    Return the cached response of a Daikon GET, or fetch and cache it.
+
+    Args:
+        operation (str): The Daikon API function, which selects the TTL.
+        argument (str): The value the response depends on (SMILES or ID).
+        fetch (Callable[[], Any]): Performs the request; returns None on failure.
+
+    Returns:
+        Any: The JSON response, or None if the request failed.
+    """
+    ttl = _cache_ttl(operation, argument)
+    if not ttl:
+        return fetch()
+
+    key = _cache_key(operation, str(argument))
+    found, value = _memory_lookup(operation, key)
+    if found:
+        return value
+
+    try:
+        payload = _get_redis().get(key)
+    except Exception as e:
+        logger.warning(f"Daikon cache unavailable: {str(e)}")
+        payload = None
+    if payload is not None:
+        return _redis_hit(operation, key, payload, ttl)
+
+    daikon_cache_total.labels(operation=operation, result="miss").inc()
+    value = fetch()
+    if value is None:
+        return None
+
+    ttl = _store_ttl(value, ttl)
+    _memory_set(key, value, ttl)
+    try:
+        _get_redis().set(key, json.dumps(value), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Could not store Daikon response in the cache: {str(e)}")
+    return value
+
+
+async def cached_call_async(
+    operation: str, argument: str, fetch: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    The async counterpart of `cached_call`, sharing its in-process cache and
+    Redis keys.
+
+    Args:
+        operation (str): The Daikon API function, which selects the TTL.
+        argument (str): The value the response depends on (SMILES or ID).
+        fetch (Callable[[], Awaitable[Any]]): Performs the request; returns None on failure.
+
+    Returns:
+        Any: The JSON response, or None if the request failed.
+    """
+    ttl = _cache_ttl(operation, argument)
+    if not ttl:
+        return await fetch()
+
+    key = _cache_key(operation, str(argument))
+    found, value = _memory_lookup(operation, key)
+    if found:
+        return value
+
+    try:
+        payload = await _get_async_redis().get(key)
+    except Exception as e:
+        logger.warning(f"Daikon cache unavailable: {str(e)}")
+        payload = None
+    if payload is not None:
+        return _redis_hit(operation, key, payload, ttl)
+
+    daikon_cache_total.labels(operation=operation, result="miss").inc()
+    value = await fetch()
+    if value is None:
+        return None
+
+    ttl = _store_ttl(value, ttl)
+    _memory_set(key, value, ttl)
+    try:
+        await _get_async_redis().set(key, json.dumps(value), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Could not store Daikon response in the cache: {str(e)}")
+    return value
+
+
+async def close_async_redis():
+    """Close the Redis client of the running loop. Call before the loop is closed."""
+    client = _async_redis_clients.pop(asyncio.get_running_loop(), None)
+    if client is None:
+        return
+    # redis-py 5 renamed close() to aclose()
+    if hasattr(client, "aclose"):
+        await client.aclose()
+    else:
+        await client.close()
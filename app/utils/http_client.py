@@ -1,11 +1,156 @@
 import os
+import random
+import threading
+import time
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlparse
 from dotenv import load_dotenv
+from app.core.logging_config import logger
+from app.core.metrics import (
+    http_circuit_open,
+    http_client_request_seconds,
+    http_client_requests_total,
+)
 
 # Load environment variables from a .env file (if available)
 load_dotenv()
 
+# Connect and read timeouts, in seconds
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+
+# Keep-alive connections kept per host
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+
+# Idempotent requests are retried on connection errors, timeouts and these
+# statuses, with exponential backoff and full jitter
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.2"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "5"))
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# After this many consecutive failures a host is failed fast for
+# HTTP_BREAKER_RESET seconds, then a single trial request is let through
+HTTP_BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+HTTP_BREAKER_RESET = float(os.getenv("HTTP_BREAKER_RESET", "30"))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one host."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def acquire(self) -> Tuple[bool, bool]:
+        """
+        Return whether a request may be sent now, and whether it is the
+        half-open trial. The trial must end with `record_success`,
+        `record_failure` or, if it is abandoned, `release_trial`.
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True, False
+            if time.monotonic() - self.opened_at < HTTP_BREAKER_RESET or self.trial_in_flight:
+                return False, False
+            # Half-open: let one trial request through
+            self.trial_in_flight = True
+            return True, True
+
+    def release_trial(self):
+        """Give up the trial without an outcome, so the next request becomes the trial."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit for {self.host} closed")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+            http_circuit_open.labels(host=self.host).set(0)
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= HTTP_BREAKER_THRESHOLD:
+                if self.opened_at is None or self.trial_in_flight:
+                    logger.warning(
+                        f"Circuit for {self.host} opened after {self.failures} failure(s)"
+                    )
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+                http_circuit_open.labels(host=self.host).set(1)
+
+
+_sessions: Dict[str, requests.Session] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_session(base_url: str) -> requests.Session:
+    """Return the pooled session for a base URL, creating it on first use."""
+    with _registry_lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[base_url] = session
+        return session
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    """Return the circuit breaker of a host, shared by the sync and async clients."""
+    with _registry_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return the delay before retry `attempt` (0-based), with full jitter."""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
+
+
+def is_retryable(method: str, transport_error: bool, status_code: Optional[int]) -> bool:
+    """
+    Return whether a failed attempt of an idempotent request should be retried.
+    `transport_error` is set when the request failed to connect or timed out.
+    """
+    if method not in IDEMPOTENT_METHODS:
+        return False
+    if transport_error:
+        return True
+    return status_code in RETRY_STATUSES
+
+
+def is_failure(transport_error: bool, status_code: Optional[int]) -> bool:
+    """Return whether an attempt counts against the host's circuit breaker."""
+    if transport_error:
+        return True
+    return status_code is not None and status_code >= 500
+
+
+def attempt_outcome(timed_out: bool, status_code: Optional[int]) -> str:
+    """Return the metric label of a failed attempt."""
+    if timed_out:
+        return "timeout"
+    if status_code is None:
+        return "connection_error"
+    if status_code >= 400:
+        return f"http_{status_code}"
+    return "invalid_response"
+
 
 def api_client(
     base_url: str,
@@ -15,10 +160,15 @@ def api_client(
     params: Optional[Dict[str, Any]] = None,
     data: Optional[Dict[str, Any]] = None,
     auth_token: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> Optional[Dict[str, Any]]:
     """
     A generic API client for making HTTP requests.
 
+    Connections are pooled and kept alive per base URL. Idempotent requests
+    are retried with exponential backoff and jitter, and a host that keeps
+    failing is failed fast by a circuit breaker until it recovers.
+
     Args:
         endpoint (str): The API endpoint to send the request to.
         method (str): The HTTP method to use (default is "GET").
@@ -26,6 +176,7 @@ def api_client(
         params (Dict[str, Any], optional): Query parameters for the request.
         data (Dict[str, Any], optional): JSON body data for the request.
         auth_token (str, optional): An authorization token for the request.
+        timeout (float, optional): The read timeout, overriding HTTP_READ_TIMEOUT.
 
     Returns:
         Optional[Dict[str, Any]]: The JSON response from the API, or None if an error occurs.
@@ -33,9 +184,14 @@ def api_client(
     if not base_url:
         raise ValueError("API_BASE_URL is not set in the environment variables.")
 
+    method = method.upper()
+    if method not in {"GET", "POST", "PUT", "DELETE"}:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+
     url = f"{base_url}{endpoint}"
+    host = urlparse(base_url).netloc or base_url
     default_headers = {"accept": "application/json"}
-    
+
     # Add authorization header if auth_token is provided
     if auth_token:
         default_headers['Authorization'] = f'Bearer {auth_token}'
@@ -43,23 +199,68 @@ def api_client(
     # Merge provided headers with default headers
     headers = {**default_headers, **(headers or {})}
 
-    try:
-        # Select appropriate request method
-        if method.upper() == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method.upper() == "POST":
-            response = requests.post(url, headers=headers, json=data)
-        elif method.upper() == "PUT":
-            response = requests.put(url, headers=headers, json=data)
-        elif method.upper() == "DELETE":
-            response = requests.delete(url, headers=headers, json=data)
-                                       
+    session = _get_session(base_url)
+    breaker = get_breaker(host)
+    attempt = 0
+    while True:
+        allowed, trial = breaker.acquire()
+        if not allowed:
+            http_client_requests_total.labels(host=host, method=method, outcome="circuit_open").inc()
+            logger.warning(f"API request to {url} skipped: circuit for {host} is open")
+            return None
+
+        error, status_code = None, None
+        start = time.perf_counter()
+        try:
+            response = session.request(
+                method,
+                url,
+                headers=headers,
+                params=params if method == "GET" else None,
+                json=data if method != "GET" else None,
+                timeout=(HTTP_CONNECT_TIMEOUT, timeout or HTTP_READ_TIMEOUT),
+            )
+            status_code = response.status_code
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            result = response.json()
+        except requests.exceptions.RequestException as e:
+            error = e
+        except BaseException:
+            # Interrupted (task time limit, gevent timeout, shutdown) or an
+            # unexpected error: a trial without an outcome must not keep the
+            # circuit open forever
+            if trial:
+                breaker.release_trial()
+            raise
+        finally:
+            http_client_request_seconds.labels(host=host, method=method).observe(
+                time.perf_counter() - start
+            )
+
+        if error is None:
+            breaker.record_success()
+            http_client_requests_total.labels(host=host, method=method, outcome="success").inc()
+            return result
+
+        transport_error = isinstance(
+            error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        )
+        if is_failure(transport_error, status_code):
+            breaker.record_failure()
         else:
-            raise ValueError(f"Unsupported HTTP method: {method}")
+            # The host answered; a 4xx is not an outage
+            breaker.record_success()
+        outcome = attempt_outcome(isinstance(error, requests.exceptions.Timeout), status_code)
+        http_client_requests_total.labels(host=host, method=method, outcome=outcome).inc()
 
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        return response.json()
+        if attempt < HTTP_MAX_RETRIES and is_retryable(method, transport_error, status_code):
+            delay = backoff_delay(attempt)
+            logger.warning(
+                f"API request to {url} failed ({outcome}), retrying in {delay:.2f}s: {error}"
+            )
+            attempt += 1
+            time.sleep(delay)
+            continue
 
-    except requests.exceptions.RequestException as e:
-        print(f"API request failed: {e}")
-        return None
\ No newline at end of file
+        logger.error(f"API request failed: {error}")
+        return None
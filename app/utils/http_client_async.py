@@ -0,0 +1,183 @@
+import asyncio
+import os
+import time
+import weakref
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+import httpx
+from dotenv import load_dotenv
+from app.core.logging_config import logger
+from app.core.metrics import http_client_request_seconds, http_client_requests_total
+from app.utils.http_client import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_SIZE,
+    HTTP_READ_TIMEOUT,
+    attempt_outcome,
+    backoff_delay,
+    get_breaker,
+    is_failure,
+    is_retryable,
+)
+
+# Load environment variables from a .env file (if available)
+load_dotenv()
+
+# Maximum number of requests in flight per host, per event loop
+HTTP_ASYNC_CONCURRENCY = int(os.getenv("HTTP_ASYNC_CONCURRENCY", str(HTTP_POOL_SIZE)))
+
+# Clients and semaphores belong to the event loop they were created on, so
+# they are kept per loop: the API has a single loop, while hooks run on a
+# short-lived loop per execution.
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_client(base_url: str) -> httpx.AsyncClient:
+    """Return the pooled client for a base URL on the running loop."""
+    clients = _loop_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(base_url)
+    if client is None:
+        client = clients[base_url] = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE
+            ),
+        )
+    return client
+
+
+def _get_semaphore(host: str) -> asyncio.Semaphore:
+    semaphores = _loop_semaphores.setdefault(asyncio.get_running_loop(), {})
+    semaphore = semaphores.get(host)
+    if semaphore is None:
+        semaphore = semaphores[host] = asyncio.Semaphore(HTTP_ASYNC_CONCURRENCY)
+    return semaphore
+
+
+async def close_clients():
+    """Close the clients of the running loop. Call before the loop is closed."""
+    clients = _loop_clients.pop(asyncio.get_running_loop(), {})
+    _loop_semaphores.pop(asyncio.get_running_loop(), None)
+    for client in clients.values():
+        await client.aclose()
+
+
+async def api_client(
+    base_url: str,
+    endpoint: str,
+    method: str = "GET",
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    data: Optional[Dict[str, Any]] = None,
+    auth_token: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    The async counterpart of `app.utils.http_client.api_client`.
+
+    Timeouts, retries and the per-host circuit breaker behave the same, and
+    the breaker is shared with the sync client. Requests to a host are
+    limited to HTTP_ASYNC_CONCURRENCY in flight.
+
+    Args:
+        endpoint (str): The API endpoint to send the request to.
+        method (str): The HTTP method to use (default is "GET").
+        headers (Dict[str, str], optional): HTTP headers for the request.
+        params (Dict[str, Any], optional): Query parameters for the request.
+        data (Dict[str, Any], optional): JSON body data for the request.
+        auth_token (str, optional): An authorization token for the request.
+        timeout (float, optional): The read timeout, overriding HTTP_READ_TIMEOUT.
+
+    Returns:
+        Optional[Dict[str, Any]]: The JSON response from the API, or None if an error occurs.
+    """
+    if not base_url:
+        raise ValueError("API_BASE_URL is not set in the environment variables.")
+
+    method = method.upper()
+    if method not in {"GET", "POST", "PUT", "DELETE"}:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+
+    url = f"{base_url}{endpoint}"
+    host = urlparse(base_url).netloc or base_url
+    default_headers = {"accept": "application/json"}
+
+    # Add authorization header if auth_token is provided
+    if auth_token:
+        default_headers['Authorization'] = f'Bearer {auth_token}'
+
+    # Merge provided headers with default headers
+    headers = {**default_headers, **(headers or {})}
+
+    client = _get_client(base_url)
+    semaphore = _get_semaphore(host)
+    breaker = get_breaker(host)
+    request_timeout = httpx.Timeout(
+        timeout or HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT
+    )
+    attempt = 0
+    while True:
+        allowed, trial = breaker.acquire()
+        if not allowed:
+            http_client_requests_total.labels(host=host, method=method, outcome="circuit_open").inc()
+            logger.warning(f"API request to {url} skipped: circuit for {host} is open")
+            return None
+
+        error, status_code = None, None
+        try:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.request(
+                        method,
+                        url,
+                        headers=headers,
+                        params=params if method == "GET" else None,
+                        json=data if method != "GET" else None,
+                        timeout=request_timeout,
+                    )
+                    status_code = response.status_code
+                    response.raise_for_status()  # Raise an exception for HTTP errors
+                    result = response.json()
+                except (httpx.HTTPError, ValueError) as e:
+                    error = e
+                finally:
+                    http_client_request_seconds.labels(host=host, method=method).observe(
+                        time.perf_counter() - start
+                    )
+        except BaseException:
+            # Cancelled while waiting or in flight, or an unexpected error:
+            # release the trial, which is shared with the sync client
+            if trial:
+                breaker.release_trial()
+            raise
+
+        if error is None:
+            breaker.record_success()
+            http_client_requests_total.labels(host=host, method=method, outcome="success").inc()
+            return result
+
+        transport_error = isinstance(error, httpx.TransportError)
+        if is_failure(transport_error, status_code):
+            breaker.record_failure()
+        else:
+            # The host answered; a 4xx is not an outage
+            breaker.record_success()
+        outcome = attempt_outcome(isinstance(error, httpx.TimeoutException), status_code)
+        http_client_requests_total.labels(host=host, method=method, outcome=outcome).inc()
+
+        if attempt < HTTP_MAX_RETRIES and is_retryable(method, transport_error, status_code):
+            delay = backoff_delay(attempt)
+            logger.warning(
+                f"API request to {url} failed ({outcome}), retrying in {delay:.2f}s: {error}"
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+            continue
+
+        logger.error(f"API request failed: {error}")
+        return None
@@ -0,0 +1,70 @@
+import hashlib
+from typing import List, Set, Tuple
+from pypdf import PdfReader
+from pypdf.generic import IndirectObject
+from app.core.logging_config import logger
+
+
+def _hash_xobjects(sha256, resources, visited: Set[Tuple[int, int]]):
+    """
+    Add the data of every XObject in a resource dictionary to `sha256`,
+    descending into the resources of form XObjects, so that an image nested
+    in a group (common in PowerPoint exports) is covered too. XObjects already
+    hashed on this page are referenced by name only, which also stops cycles.
+    """
+    resources = resources.get_object() if resources is not None else None
+    xobjects = resources.get("/XObject") if resources else None
+    if not xobjects:
+        return
+    xobjects = xobjects.get_object()
+    for name in sorted(xobjects.keys()):
+        sha256.update(name.encode())
+        reference = xobjects.raw_get(name)
+        if isinstance(reference, IndirectObject):
+            key = (reference.idnum, reference.generation)
+            if key in visited:
+                continue
+            visited.add(key)
+        xobject = reference.get_object()
+        sha256.update(xobject.get_data())
+        if xobject.get("/Subtype") == "/Form":
+            _hash_xobjects(sha256, xobject.get("/Resources"), visited)
+
+
+def calculate_page_hashes(file_path: str) -> List[str]:
+    """
+    Calculate a SHA-256 hash of the content of each page of a PDF.
+
+    A page hash covers the page geometry and rotation, the decoded content
+    stream and the data of every XObject (image or form) the page draws,
+    including those nested in form XObjects, so
+    an unchanged slide keeps its hash even when other slides are edited,
+    inserted or removed.
+
+    Args:
+        file_path (str): Path to the PDF file.
+
+    Returns:
+        List[str]: One hexadecimal hash per page, in page order, or an empty
+        list if the PDF cannot be parsed.
+    """
+    try:
+        reader = PdfReader(file_path)
+        page_hashes = []
+        for page in reader.pages:
+            sha256 = hashlib.sha256()
+            sha256.update(repr(list(page.mediabox)).encode())
+            sha256.update(str(page.get("/Rotate", 0)).encode())
+
+            contents = page.get_contents()
+            if contents is not None:
+                sha256.update(contents.get_data())
+
+            _hash_xobjects(sha256, page.get("/Resources"), set())
+
+            page_hashes.append(sha256.hexdigest())
+        return page_hashes
+
+    except Exception as e:
+        logger.error(f"Could not calculate page hashes for {file_path}: {str(e)}")
+        return []
@@ -0,0 +1,116 @@
+import json
+import os
+import time
+from typing import AsyncIterator, Optional
+import redis.asyncio as aioredis
+from app.core.celery_app import broker, redis_connection
+from app.core.logging_config import logger
+
+# Progress events of a document run are published on a Redis channel named
+# after the task the client was given. The last event is also kept under its
+# own key, so a client that subscribes late starts from the current stage.
+PROGRESS_CHANNEL_PREFIX = "decimer:progress:"
+PROGRESS_LAST_PREFIX = "decimer:progress-last:"
+PROGRESS_TTL = int(os.getenv("PROGRESS_TTL", "3600"))
+
+# Stages after which the run has finished; `update_state` must not be called
+# for them, since the task result replaces the PROGRESS state
+FINISHED_STAGES = {"completed", "failed", "hooks_completed"}
+
+_async_client: Optional[aioredis.Redis] = None
+
+
+def is_final_event(event: dict) -> bool:
+    """Return whether no further events will follow `event`."""
+    if event["stage"] == "completed":
+        return not event.get("hooks_pending")
+    return event["stage"] in FINISHED_STAGES
+
+
+def publish_progress(task_id: str, event: dict):
+    """Publish a progress event and remember it as the latest one."""
+    payload = json.dumps(event, default=str)
+    try:
+        pipe = redis_connection.pipeline()
+        pipe.publish(f"{PROGRESS_CHANNEL_PREFIX}{task_id}", payload)
+        pipe.set(f"{PROGRESS_LAST_PREFIX}{task_id}", payload, ex=PROGRESS_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not publish progress for task {task_id}: {str(e)}")
+
+
+class ProgressReporter:
+    """
+    Report the stages of a document run to clients.
+
+    Events are stored as the task's PROGRESS state (for the status endpoint)
+    and published over Redis pub/sub (for the progress stream). Subtasks of a
+    fanned-out document report under the id of the task the client was given.
+    Fields in `context` (such as the document and run ids, once known) are
+    added to every event.
+    """
+
+    def __init__(self, task=None, task_id: Optional[str] = None, **context):
+        self.task = task
+        if task_id is None and task is not None:
+            task_id = task.request.root_id or task.request.id
+        self.task_id = task_id
+        self.context = context
+
+    def report(self, stage: str, **data):
+        """Report that the run reached `stage`, with stage-specific details."""
+        if not self.task_id:
+            return
+        event = {
+            "task_id": self.task_id,
+            "stage": stage,
+            "timestamp": time.time(),
+            **self.context,
+            **data,
+        }
+        if self.task is not None and stage not in FINISHED_STAGES:
+            try:
+                self.task.update_state(task_id=self.task_id, state="PROGRESS", meta=event)
+            except Exception as e:
+                logger.warning(f"Could not update state of task {self.task_id}: {str(e)}")
+        publish_progress(self.task_id, event)
+
+
+async def iter_progress_events(
+    task_id: str, heartbeat: float = 15.0
+) -> AsyncIterator[Optional[dict]]:
+    """
+    Yield the progress events of a task as they are published.
+
+    The latest event is yielded first if there is one. None is yielded
+    whenever `heartbeat` seconds pass without an event, so the caller can
+    keep the connection alive and check whether the task is still running.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(broker)
+
+    pubsub = _async_client.pubsub()
+    await pubsub.subscribe(f"{PROGRESS_CHANNEL_PREFIX}{task_id}")
+    try:
+        last = await _async_client.get(f"{PROGRESS_LAST_PREFIX}{task_id}")
+        if last:
+            event = json.loads(last)
+            yield event
+            if is_final_event(event):
+                return
+
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=heartbeat
+            )
+            if message is None:
+                yield None
+                continue
+            event = json.loads(message["data"])
+            yield event
+            if is_final_event(event):
+                return
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.close()
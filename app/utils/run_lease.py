@@ -0,0 +1,148 @@
+import os
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+from app.core.celery_app import redis_connection
+from app.core.logging_config import logger
+
+# Leases on a document run, held by the tasks processing it. A document's
+# status only says a run was started; a lease says a live worker is still on
+# it. Before a task resumes a run (deleting the results saved after the last
+# checkpoint and redoing those pages) it takes the run exclusively, which
+# fails while another task, or another delivery of the same task, holds it.
+# Page-range subtasks of a fanned-out run share it. Holders renew their lease
+# every RUN_LEASE_HEARTBEAT seconds, so a lease outlives a crashed worker by
+# at most RUN_LEASE_TTL seconds.
+RUN_LEASE_TTL = int(os.getenv("RUN_LEASE_TTL", "120"))
+RUN_LEASE_HEARTBEAT = float(os.getenv("RUN_LEASE_HEARTBEAT", str(RUN_LEASE_TTL / 4)))
+LEASE_PREFIX = "decimer:run-lease:"
+
+# Each run has a hash of holders: task id -> "<token> <expiry> <mode>". The
+# token identifies one execution, so a redelivered copy of a running task
+# (same task id) is told apart from the original.
+_ACQUIRE_SCRIPT = redis_connection.register_script(
+    """
+    local now = tonumber(redis.call('TIME')[1])
+    local holders = redis.call('HGETALL', KEYS[1])
+    for index = 1, #holders, 2 do
+        local holder, value = holders[index], holders[index + 1]
+        local token, expiry, mode = string.match(value, '(%S+) (%S+) (%S+)')
+        if tonumber(expiry) < now then
+            redis.call('HDEL', KEYS[1], holder)
+        elseif holder == ARGV[1] then
+            if token ~= ARGV[2] then
+                return holder
+            end
+        elseif ARGV[4] == 'exclusive' or mode == 'exclusive' then
+            return holder
+        end
+    end
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2] .. ' ' .. (now + ARGV[3]) .. ' ' .. ARGV[4])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    return false
+    """
+)
+
+# Renew, downgrade to shared, or drop a lease, only if it is still held by
+# this execution
+_RENEW_SCRIPT = redis_connection.register_script(
+    """
+    local value = redis.call('HGET', KEYS[1], ARGV[1])
+    if not value or string.match(value, '%S+') ~= ARGV[2] then
+        return 0
+    end
+    if ARGV[3] == 'release' then
+        redis.call('HDEL', KEYS[1], ARGV[1])
+        return 1
+    end
+    local now = tonumber(redis.call('TIME')[1])
+    local mode = string.match(value, '(%S+)$')
+    if ARGV[3] == 'share' then
+        mode = 'shared'
+    end
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2] .. ' ' .. (now + ARGV[4]) .. ' ' .. mode)
+    if redis.call('TTL', KEYS[1]) < tonumber(ARGV[4]) then
+        redis.call('EXPIRE', KEYS[1], ARGV[4])
+    end
+    return 1
+    """
+)
+
+# Token and heartbeat stop event of the leases held in this process
+_leases: Dict[Tuple[str, str], Tuple[str, threading.Event]] = {}
+
+
+def _lease_key(document_id, run_id: int) -> str:
+    return f"{LEASE_PREFIX}{document_id}:{run_id}"
+
+
+def acquire_run_lease(
+    document_id, run_id: int, task_id: str, exclusive: bool = False
+) -> Optional[str]:
+    """
+    Take a lease on a document run and keep it alive until it is released.
+
+    Args:
+        document_id: The document's id.
+        run_id (int): The run.
+        task_id (str): The id of the task taking the lease.
+        exclusive (bool): Whether no other task may hold the run, as needed
+            to start or resume it. Shared leases, taken by page-range
+            subtasks, only exclude exclusive holders.
+
+    Returns:
+        Optional[str]: None if the lease was taken, otherwise the id of the
+        task holding the run. That is `task_id` itself when another delivery
+        of the same task is still running.
+    """
+    lease_key = _lease_key(document_id, run_id)
+    token = uuid.uuid4().hex
+    holder = _ACQUIRE_SCRIPT(
+        keys=[lease_key],
+        args=[task_id, token, RUN_LEASE_TTL, "exclusive" if exclusive else "shared"],
+    )
+    if holder is not None:
+        return holder.decode() if isinstance(holder, bytes) else holder
+
+    stop = threading.Event()
+    _leases[(lease_key, task_id)] = (token, stop)
+
+    def beat():
+        while not stop.wait(RUN_LEASE_HEARTBEAT):
+            try:
+                renewed = _RENEW_SCRIPT(
+                    keys=[lease_key], args=[task_id, token, "renew", RUN_LEASE_TTL]
+                )
+                if not renewed:
+                    logger.warning(f"Lost the lease on {lease_key} held by task {task_id}")
+                    return
+            except Exception as e:
+                logger.error(f"Could not renew the lease on {lease_key}: {str(e)}")
+
+    threading.Thread(
+        target=beat, name=f"run-lease-heartbeat-{task_id}", daemon=True
+    ).start()
+    return None
+
+
+def release_run_lease(document_id, run_id: int, task_id: str, hand_over: bool = False):
+    """
+    Stop renewing a lease taken with `acquire_run_lease` and drop it.
+
+    With `hand_over`, the lease is instead made shared and left to expire
+    after RUN_LEASE_TTL. This covers a fanned-out run until its page-range
+    subtasks have started and taken their own leases.
+    """
+    lease_key = _lease_key(document_id, run_id)
+    lease = _leases.pop((lease_key, task_id), None)
+    if lease is None:
+        return
+    token, stop = lease
+    stop.set()
+    try:
+        _RENEW_SCRIPT(
+            keys=[lease_key],
+            args=[task_id, token, "share" if hand_over else "release", RUN_LEASE_TTL],
+        )
+    except Exception as e:
+        logger.error(f"Could not release the lease on {lease_key}: {str(e)}")
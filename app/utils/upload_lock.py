@@ -0,0 +1,183 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Optional
+from celery.result import AsyncResult
+from celery.signals import task_postrun, task_prerun
+from app.core.celery_app import redis_connection
+from app.core.logging_config import logger
+
+# Single-flight lock so that concurrent uploads of the same content to the
+# same path run once. The lock maps the file hash and path to the task
+# processing them, and a reverse key maps the task back to the lock so the
+# worker can release it without knowing either. Uploads of the same content to
+# another path get their own task, which links that path to the results.
+# The TTL bounds how long a crashed worker can hold a lock; running tasks
+# renew it every UPLOAD_LOCK_HEARTBEAT seconds.
+UPLOAD_LOCK_TTL = int(os.getenv("UPLOAD_LOCK_TTL", "3600"))
+UPLOAD_LOCK_HEARTBEAT = float(os.getenv("UPLOAD_LOCK_HEARTBEAT", str(UPLOAD_LOCK_TTL / 3)))
+LOCK_PREFIX = "decimer:upload-lock:"
+TASK_PREFIX = "decimer:upload-task:"
+
+# Tasks whose completion ends the processing of an upload. A fanned-out
+# document finishes in the merge task, which inherits the original task id.
+LOCK_RELEASING_TASKS = {
+    "app.pipeline.smiles_prediction.predict_smiles",
+    "app.pipeline.smiles_prediction.merge_page_results",
+}
+
+# Tasks that work on an upload and keep its lock alive while they run. The
+# page-range subtasks and the merge task renew the lock of their root task.
+LOCK_HOLDING_TASKS = LOCK_RELEASING_TASKS | {
+    "app.pipeline.smiles_prediction.predict_smiles_pages",
+}
+
+# Set both keys only if the upload is not locked; otherwise return the holder
+_ACQUIRE_SCRIPT = redis_connection.register_script(
+    """
+    if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+        redis.call('SET', KEYS[2], KEYS[1], 'EX', ARGV[2])
+        return false
+    end
+    return redis.call('GET', KEYS[1])
+    """
+)
+
+# Delete both keys only if the lock is still held by this task
+_RELEASE_SCRIPT = redis_connection.register_script(
+    """
+    local lock_key = redis.call('GET', KEYS[1])
+    redis.call('DEL', KEYS[1])
+    if lock_key and redis.call('GET', lock_key) == ARGV[1] then
+        redis.call('DEL', lock_key)
+        return 1
+    end
+    return 0
+    """
+)
+
+
+# Extend both keys only if the lock is still held by this task
+_RENEW_SCRIPT = redis_connection.register_script(
+    """
+    local lock_key = redis.call('GET', KEYS[1])
+    if lock_key and redis.call('GET', lock_key) == ARGV[1] then
+        redis.call('EXPIRE', lock_key, ARGV[2])
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+        return 1
+    end
+    return 0
+    """
+)
+
+# Heartbeat stop events of the tasks running in this process, by task id
+_heartbeats: Dict[str, threading.Event] = {}
+
+
+def _lock_key(file_hash: str, file_path: str) -> str:
+    path_digest = hashlib.sha256(file_path.encode()).hexdigest()
+    return f"{LOCK_PREFIX}{file_hash}:{path_digest}"
+
+
+def acquire_upload_lock(file_hash: str, file_path: str, task_id: str) -> Optional[str]:
+    """
+    Try to lock an upload (its content at its path) for a new task.
+
+    A lock held by a task that has already finished (for example one whose
+    worker died before releasing it) is treated as stale and taken over.
+
+    Args:
+        file_hash (str): The SHA-256 hash of the uploaded file.
+        file_path (str): The path the file was saved to.
+        task_id (str): The id the new task will be enqueued with.
+
+    Returns:
+        Optional[str]: None if the lock was acquired, otherwise the id of the
+        task already processing this content at this path.
+    """
+    lock_key = _lock_key(file_hash, file_path)
+    task_key = f"{TASK_PREFIX}{task_id}"
+    for _ in range(2):
+        holder = _ACQUIRE_SCRIPT(keys=[lock_key, task_key], args=[task_id, UPLOAD_LOCK_TTL])
+        if holder is None:
+            return None
+
+        holder = holder.decode() if isinstance(holder, bytes) else holder
+        if not AsyncResult(holder).ready():
+            return holder
+        logger.warning(f"Releasing stale upload lock held by finished task {holder}")
+        release_upload_lock(holder)
+    return holder
+
+
+def release_upload_lock(task_id: str) -> bool:
+    """
+    Release the upload lock held by a task, if any.
+
+    Returns:
+        bool: Whether a lock was released.
+    """
+    try:
+        return bool(_RELEASE_SCRIPT(keys=[f"{TASK_PREFIX}{task_id}"], args=[task_id]))
+    except Exception as e:
+        logger.error(f"Could not release upload lock for task {task_id}: {str(e)}")
+        return False
+
+
+def renew_upload_lock(task_id: str) -> bool:
+    """
+    Extend the upload lock held by a task to a full UPLOAD_LOCK_TTL.
+
+    Returns:
+        bool: Whether the task still held a lock.
+    """
+    try:
+        return bool(
+            _RENEW_SCRIPT(keys=[f"{TASK_PREFIX}{task_id}"], args=[task_id, UPLOAD_LOCK_TTL])
+        )
+    except Exception as e:
+        logger.error(f"Could not renew upload lock for task {task_id}: {str(e)}")
+        return False
+
+
+@task_prerun.connect
+def start_lock_heartbeat(task_id=None, task=None, **kwargs):
+    """
+    Renew the upload lock while a document task runs, so that a long run
+    does not outlive the lock and let a re-upload start a second task.
+    """
+    if task is None or task.name not in LOCK_HOLDING_TASKS:
+        return
+    lock_task_id = task.request.root_id or task_id
+    if not renew_upload_lock(lock_task_id):
+        return
+
+    stop = threading.Event()
+    _heartbeats[task_id] = stop
+
+    def beat():
+        while not stop.wait(UPLOAD_LOCK_HEARTBEAT):
+            if not renew_upload_lock(lock_task_id):
+                return
+
+    threading.Thread(
+        target=beat, name=f"upload-lock-heartbeat-{task_id}", daemon=True
+    ).start()
+
+
+@task_postrun.connect
+def stop_lock_heartbeat(task_id=None, **kwargs):
+    """Stop renewing the upload lock once a task has finished."""
+    stop = _heartbeats.pop(task_id, None)
+    if stop is not None:
+        stop.set()
+
+
+@task_postrun.connect
+def release_lock_after_task(task_id=None, task=None, state=None, **kwargs):
+    """Release the upload lock once a document has finished processing."""
+    # A task replaced by its fan-out chord ends as IGNORED; the merge task
+    # releases the lock instead
+    if task is not None and task.name in LOCK_RELEASING_TASKS and state != "IGNORED":
+        if release_upload_lock(task_id):
+            logger.info(f"Released upload lock for task {task_id}")
@@ -0,0 +1,90 @@
+import argparse
+import logging
+import os
+import cv2
+from app.service.segmentation import cluster
+from app.service.segmentation.cluster import (
+    SEGMENT_CLUSTER_MAX_DISTANCE,
+    SEGMENT_CLUSTER_MAX_PIXEL_DIFF,
+    cluster_segments,
+    ink_mask,
+    perceptual_hash,
+    pixel_difference,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp")
+
+
+def load_labelled_pairs(directory: str):
+    """
+    Yield (pair name, images, label) from a labelled set of segment pairs.
+
+    The set is laid out as `<directory>/same/<pair>/*` for two crops of the
+    same molecule (for example the same drawing on two slides) and
+    `<directory>/different/<pair>/*` for two similar but different molecules,
+    such as analogues that differ by one substituent.
+    """
+    for label in ("same", "different"):
+        label_dir = os.path.join(directory, label)
+        if not os.path.isdir(label_dir):
+            logging.warning(f"Missing label directory: {label_dir}")
+            continue
+        for pair in sorted(os.listdir(label_dir)):
+            pair_dir = os.path.join(label_dir, pair)
+            if not os.path.isdir(pair_dir):
+                continue
+            images = [
+                cv2.imread(os.path.join(pair_dir, file_name))
+                for file_name in sorted(os.listdir(pair_dir))
+                if file_name.lower().endswith(IMAGE_EXTENSIONS)
+            ]
+            images = [image for image in images if image is not None]
+            if len(images) == 2:
+                yield pair, images, label == "same"
+            else:
+                logging.warning(f"Expected two images in {pair_dir}, found {len(images)}")
+
+
+def run_benchmark(directory: str):
+    """
+    Report how often near-duplicate grouping merges different molecules
+    (false merges, which copy a wrong SMILES) and how often it keeps crops
+    of the same molecule apart (missed merges, which only cost a prediction),
+    with the hash distance and pixel difference of every pair.
+    """
+    # Measure grouping whether or not the pipeline has it enabled
+    cluster.SEGMENT_CLUSTER_ENABLED = True
+    counts = {True: [0, 0], False: [0, 0]}  # label -> [pairs, merged]
+    for pair, images, same in load_labelled_pairs(directory):
+        merged = cluster_segments(images) == [0, 0]
+        distance = bin(perceptual_hash(images[0]) ^ perceptual_hash(images[1])).count("1")
+        difference = pixel_difference(ink_mask(images[0]), ink_mask(images[1]))
+        counts[same][0] += 1
+        counts[same][1] += int(merged)
+        logging.info(
+            f"{'same' if same else 'different':>9} {pair}: hash distance {distance}, "
+            f"pixel difference {difference:.3f}, {'merged' if merged else 'kept apart'}"
+        )
+
+    logging.info(
+        f"Thresholds: hash distance <= {SEGMENT_CLUSTER_MAX_DISTANCE}, "
+        f"pixel difference <= {SEGMENT_CLUSTER_MAX_PIXEL_DIFF}"
+    )
+    same_pairs, same_merged = counts[True]
+    different_pairs, different_merged = counts[False]
+    if different_pairs:
+        logging.info(f"False merges: {different_merged}/{different_pairs}")
+    if same_pairs:
+        logging.info(f"Missed merges: {same_pairs - same_merged}/{same_pairs}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate segment grouping.")
+    parser.add_argument("directory", help="Directory with same/ and different/ segment pairs")
+    args = parser.parse_args()
+    run_benchmark(args.directory)
@@ -0,0 +1,80 @@
+import argparse
+import logging
+import os
+import time
+import cv2
+from app.service.segmentation.page_filter import page_may_contain_structures
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp")
+
+
+def load_labelled_pages(directory: str):
+    """
+    Yield (path, label) pairs from a labelled page set.
+
+    The set is laid out as `<directory>/positive/*` for pages that contain at
+    least one chemical structure and `<directory>/negative/*` for pages that
+    do not.
+    """
+    for label in ("positive", "negative"):
+        label_dir = os.path.join(directory, label)
+        if not os.path.isdir(label_dir):
+            logging.warning(f"Missing label directory: {label_dir}")
+            continue
+        for file_name in sorted(os.listdir(label_dir)):
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(label_dir, file_name), label == "positive"
+
+
+def run_benchmark(directory: str):
+    """
+    Run the page pre-filter over a labelled page set and report skip rate,
+    recall on pages with structures and time per page.
+    """
+    total = skipped = positives = kept_positives = 0
+    elapsed = 0.0
+    missed = []
+
+    for path, has_structures in load_labelled_pages(directory):
+        image = cv2.imread(path)
+        if image is None:
+            logging.warning(f"Could not read image: {path}")
+            continue
+
+        start = time.perf_counter()
+        keep, reason = page_may_contain_structures(image)
+        elapsed += time.perf_counter() - start
+
+        total += 1
+        if not keep:
+            skipped += 1
+        if has_structures:
+            positives += 1
+            if keep:
+                kept_positives += 1
+            else:
+                missed.append((path, reason))
+
+    if total == 0:
+        logging.error(f"No labelled pages found in {directory}")
+        return
+
+    logging.info(f"Pages: {total} ({positives} with structures)")
+    logging.info(f"Skip rate: {skipped / total:.2%}")
+    if positives:
+        logging.info(f"Recall: {kept_positives / positives:.2%}")
+    logging.info(f"Mean filter time: {1000 * elapsed / total:.2f} ms/page")
+    for path, reason in missed:
+        logging.info(f"Missed: {path} ({reason})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the page pre-filter.")
+    parser.add_argument("directory", help="Directory with positive/ and negative/ page images")
+    args = parser.parse_args()
+    run_benchmark(args.directory)
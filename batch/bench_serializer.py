@@ -0,0 +1,82 @@
+import argparse
+import logging
+import time
+import uuid
+from kombu.serialization import dumps, loads
+from app.core.serializer import BINARY_SERIALIZER, register_binary_serializer
+from app.schema.inputs.document import Document
+from app.schema.results.prediction_result import PredictionResult
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def build_results(document: Document, count: int):
+    """Build `count` prediction results of a document, as the hooks receive them."""
+    results = []
+    for index in range(count):
+        result = PredictionResult(
+            document_id=document.id,
+            run_id=document.run_id,
+            file_path=document.file_path,
+            page=index // 4 + 1,
+            predicted_smiles="CC(=O)OC1=CC=CC=C1C(=O)O",
+        )
+        result.confidence = 0.93
+        result.add_history(step="Segmentation", status="Success")
+        result.add_history(step="Prediction", status="Success")
+        results.append(result)
+    return results
+
+
+def time_call(func, repeat: int) -> float:
+    """Return the best wall time of `repeat` calls to `func`, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(count: int, repeat: int):
+    """
+    Compare the JSON and binary serializers on the largest message the
+    pipeline sends: the `run_hooks` arguments, a document and its results
+    without segment images (see app.pipeline.hooks.dispatch_hooks).
+    """
+    register_binary_serializer()
+    document = Document(id=uuid.uuid4(), file_path="/data/documents/example.pdf", run_id=1)
+    results = build_results(document, count)
+    args = [
+        ["smiles_pred_enrichment", "smiles_pred_res_post"],
+        document.json_serializable(),
+        [res.json_serializable() for res in results],
+        str(uuid.uuid4()),
+    ]
+    logging.info(f"Results: {count}")
+
+    for serializer in ("json", BINARY_SERIALIZER):
+        content_type, encoding, data = dumps(args, serializer=serializer)
+        encode_seconds = time_call(lambda: dumps(args, serializer=serializer), repeat)
+        decode_seconds = time_call(
+            lambda: [
+                PredictionResult.from_json_serializable(item)
+                for item in loads(data, content_type, encoding)[2]
+            ],
+            repeat,
+        )
+        logging.info(
+            f"{serializer:>16}: {len(data) / 1024:.1f} KiB, "
+            f"encode {1000 * encode_seconds:.1f} ms, decode {1000 * decode_seconds:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Celery payload serializers.")
+    parser.add_argument("--count", type=int, default=200, help="Results per document")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+    run_benchmark(args.count, args.repeat)
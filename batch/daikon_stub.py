@@ -0,0 +1,108 @@
+import argparse
+import json
+import logging
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Local stand-in for the Daikon MLX, Horizon and document store APIs. Point
+# DAIKON_MLX_URL, DAIKON_HORIZON_URL and DAIKON_DOC_URL at it to exercise the
+# hooks, the response cache and the HTTP client without the real services.
+# SMILES strings containing "X" are "not found"; the request count per path
+# is logged so cache hits can be checked. Statuses queued in `failures` under
+# a path are returned before the normal answer, to exercise retries and the
+# circuit breaker. The tests start it in-process with `start_stub`.
+
+request_counts = {}
+failures = {}
+
+
+class DaikonStubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def _reply(self, status: int, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _count(self, path: str) -> str:
+        key = path.rsplit("/", 1)[0] if path.startswith("/horizon/") else path
+        request_counts[key] = request_counts.get(key, 0) + 1
+        logging.info(f"{self.command} {path} ({request_counts[key]} so far)")
+        return key
+
+    def _queued_failure(self, key: str):
+        """Pop the next failure status queued for a path, if any."""
+        queued = failures.get(key)
+        return queued.pop(0) if queued else None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        key = self._count(url.path)
+        time.sleep(self.latency)
+        failure = self._queued_failure(key)
+        if failure:
+            return self._reply(failure, {"message": "Injected failure"})
+
+        if url.path == "/molecule/similar/":
+            smiles = query.get("SMILES", [""])[0]
+            if not smiles or "X" in smiles:
+                return self._reply(200, [])
+            molecule_id = f"mol-{zlib.crc32(smiles.encode()) % 10000}"
+            return self._reply(200, [{"id": molecule_id, "name": f"Molecule {molecule_id}"}])
+        if url.path.startswith("/horizon/find-molecule-relations/"):
+            molecule_id = url.path.rsplit("/", 1)[-1]
+            return self._reply(200, [
+                {"id": f"{molecule_id}-rel-{index}", "nodeName": f"Node {index}"}
+                for index in range(2)
+            ])
+        if url.path.startswith("/horizon/find-target/"):
+            relation_id = url.path.rsplit("/", 1)[-1]
+            return self._reply(200, {"name": f"Target of {relation_id.split('-rel-')[-1]}"})
+        if url.path == "/docu-store/parsed-docs/by-path":
+            return self._reply(404, {"message": "Not found"})
+        return self._reply(404, {"message": "Unknown endpoint"})
+
+    def do_PUT(self):
+        key = self._count(urlparse(self.path).path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        failure = self._queued_failure(key)
+        if failure:
+            return self._reply(failure, {"message": "Injected failure"})
+        return self._reply(200, body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(port: int = 0, latency: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Start the stub on a background thread and return the server; its URL is
+    http://127.0.0.1:<server.server_port>. Stop it with `server.shutdown()`.
+    """
+    DaikonStubHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", port), DaikonStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in Daikon server.")
+    parser.add_argument("--port", type=int, default=8777, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request")
+    args = parser.parse_args()
+    DaikonStubHandler.latency = args.latency
+    logging.info(f"Daikon stub listening on http://localhost:{args.port}")
+    ThreadingHTTPServer(("", args.port), DaikonStubHandler).serve_forever()
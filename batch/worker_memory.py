@@ -0,0 +1,77 @@
+import argparse
+import logging
+import os
+from typing import Dict, List
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Shared libraries whose presence in a process's memory map shows that it has
+# imported TensorFlow
+TENSORFLOW_LIBRARIES = ("libtensorflow_framework", "_pywrap_tensorflow_internal")
+
+
+def child_pids(pid: int) -> List[int]:
+    """Return the PIDs of the direct children of a process."""
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as handle:
+            children.extend(int(child) for child in handle.read().split())
+    return children
+
+
+def memory_usage(pid: int) -> Dict[str, float]:
+    """
+    Return the resident (Rss), proportional (Pss) and private memory of a
+    process in MiB. Pss splits pages shared with other processes between
+    them, so summing it over a worker's processes gives its real footprint.
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as handle:
+        for line in handle:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024.0
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "private": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def has_tensorflow(pid: int) -> bool:
+    """Return whether a process has the TensorFlow runtime mapped."""
+    with open(f"/proc/{pid}/maps") as handle:
+        return any(library in line for line in handle for library in TENSORFLOW_LIBRARIES)
+
+
+def report(parent_pid: int):
+    """
+    Log the memory use of a Celery worker's main process and its pool
+    children, and whether each has loaded TensorFlow.
+    """
+    totals = {"rss": 0.0, "pss": 0.0, "private": 0.0}
+    for role, pid in [("parent", parent_pid)] + [("child", child) for child in child_pids(parent_pid)]:
+        usage = memory_usage(pid)
+        for key in totals:
+            totals[key] += usage[key]
+        logging.info(
+            f"{role:>6} {pid}: RSS {usage['rss']:.0f} MiB, PSS {usage['pss']:.0f} MiB, "
+            f"private {usage['private']:.0f} MiB, "
+            f"TensorFlow {'loaded' if has_tensorflow(pid) else 'not loaded'}"
+        )
+    logging.info(
+        f" total: RSS {totals['rss']:.0f} MiB, PSS {totals['pss']:.0f} MiB, "
+        f"private {totals['private']:.0f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report the memory use of a prediction worker and its pool children (Linux)."
+    )
+    parser.add_argument("pid", type=int, help="PID of the Celery worker's main process")
+    args = parser.parse_args()
+    report(args.pid)
@@ -0,0 +1,5 @@
+# Worker for the network-bound enrichment and post hooks. It holds no models,
+# so a gevent (or threads) pool with high concurrency keeps many Daikon
+# requests in flight at once. Async hooks need HOOKS_POOL=threads; the worker
+# refuses to start with gevent when one is registered.
+celery -A app.core.celery_hooks.celery_app worker --loglevel=info -Q ${HOOKS_QUEUE:-hooks} --pool=${HOOKS_POOL:-gevent} --concurrency=${HOOKS_CONCURRENCY:-100}
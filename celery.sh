@@ -1 +1,11 @@
-celery -A app.core.celery_config.celery_app worker --loglevel=info --pool=solo
\ No newline at end of file
+# CELERY_POOL=solo (default) runs one document at a time in the worker process.
+# CELERY_POOL=prefork forks WORKER_CONCURRENCY children that each load the
+# models (experimental and unmeasured, see docs/worker-modes.md).
+# Hooks run on their own queue, consumed by celery-hooks.sh.
+export WORKER_CONCURRENCY=${WORKER_CONCURRENCY:-1}
+# Prefork children share their Prometheus samples through this directory,
+# which must start empty
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+celery -A app.core.celery_config.celery_app worker --loglevel=info -Q ${CELERY_QUEUES:-celery} --pool=${CELERY_POOL:-solo} --concurrency=$WORKER_CONCURRENCY
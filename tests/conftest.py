@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture
+def daikon_stub(monkeypatch):
+    """
+    Run batch/daikon_stub.py in-process and point the Daikon URLs at it.
+
+    Yields the stub module, whose `request_counts` and `failures` are reset
+    for each test.
+    """
+    from batch import daikon_stub as stub
+
+    stub.request_counts.clear()
+    stub.failures.clear()
+    server = stub.start_stub()
+    url = f"http://127.0.0.1:{server.server_port}"
+    for variable in ("DAIKON_MLX_URL", "DAIKON_HORIZON_URL", "DAIKON_DOC_URL"):
+        monkeypatch.setenv(variable, url)
+    stub.url = url
+    yield stub
+    server.shutdown()
+    server.server_close()
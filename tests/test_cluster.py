@@ -0,0 +1,47 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+Chem = pytest.importorskip("rdkit.Chem")
+Draw = pytest.importorskip("rdkit.Chem.Draw")
+
+from app.service.segmentation import cluster  # noqa: E402
+
+# Analogues that differ only by an atom label and must never share a prediction
+ANALOGUE_PAIRS = [
+    ("Clc1ccc(cc1)C(=O)O", "Brc1ccc(cc1)C(=O)O"),
+    ("Oc1ccc(cc1)C(=O)O", "Nc1ccc(cc1)C(=O)O"),
+    ("CC(=O)Nc1ccc(O)cc1", "CC(=O)Nc1ccc(N)cc1"),
+    ("Fc1ccc2[nH]ccc2c1", "Clc1ccc2[nH]ccc2c1"),
+]
+
+
+def render_segment(smiles: str) -> np.ndarray:
+    """Draw a molecule as a BGR segment, like the segmentation step returns."""
+    image = Draw.MolToImage(Chem.MolFromSmiles(smiles), size=(400, 300))
+    return np.asarray(image.convert("RGB"))[:, :, ::-1].copy()
+
+
+@pytest.fixture(autouse=True)
+def grouping_enabled(monkeypatch):
+    monkeypatch.setattr(cluster, "SEGMENT_CLUSTER_ENABLED", True)
+
+
+@pytest.mark.parametrize("first, second", ANALOGUE_PAIRS)
+def test_analogues_are_not_grouped(first, second):
+    segments = [render_segment(first), render_segment(second)]
+
+    assert cluster.cluster_segments(segments) == [0, 1]
+
+
+def test_repeated_drawings_are_grouped():
+    segment = render_segment(ANALOGUE_PAIRS[0][0])
+
+    assert cluster.cluster_segments([segment, segment.copy(), segment]) == [0, 0, 0]
+
+
+def test_grouping_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(cluster, "SEGMENT_CLUSTER_ENABLED", False)
+    segment = render_segment(ANALOGUE_PAIRS[0][0])
+
+    assert cluster.cluster_segments([segment, segment]) == [0, 1]
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+import time
+import pytest
+
+pytest.importorskip("requests")
+redis = pytest.importorskip("redis")
+pytest.importorskip("loguru")
+pytest.importorskip("prometheus_client")
+
+from app.utils import daikon_api, daikon_cache, http_client  # noqa: E402
+
+MOLECULE_PATH = "/molecule/similar/"
+
+
+@pytest.fixture(autouse=True)
+def client_state(monkeypatch):
+    """Start every test with empty caches, closed circuits and no Redis."""
+    monkeypatch.setattr(daikon_cache, "_memory_cache", OrderedDict())
+    monkeypatch.setattr(daikon_cache, "DAIKON_CACHE_ENABLED", True)
+    monkeypatch.setattr(
+        daikon_cache, "_redis_client", redis.Redis.from_url("redis://127.0.0.1:1/0")
+    )
+    monkeypatch.setattr(http_client, "_breakers", {})
+
+
+def advance_cache_clock(monkeypatch, seconds: float):
+    """Make the in-process cache see a later time."""
+    now = time.time() + seconds
+    monkeypatch.setattr(daikon_cache, "time", SimpleNamespace(time=lambda: now))
+
+
+# Response cache
+
+def test_repeated_lookups_hit_the_in_process_cache(daikon_stub):
+    first = daikon_api.get_molecule_by_smiles("CCO")
+    second = daikon_api.get_molecule_by_smiles("CCO")
+
+    assert first == second and first[0]["id"].startswith("mol-")
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 1
+
+
+def test_distinct_smiles_are_looked_up_once_each(daikon_stub):
+    responses = daikon_api.get_molecules_by_smiles(["CCO", "CCN", "CCO", "", "CCN"])
+
+    assert set(responses) == {"CCO", "CCN"}
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 2
+
+
+def test_not_found_answers_expire_before_found_ones(daikon_stub, monkeypatch):
+    assert daikon_api.get_molecule_by_smiles("CXC") == []
+    assert daikon_api.get_molecule_by_smiles("CCO")
+    assert daikon_api.get_molecule_by_smiles("CXC") == []
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 2
+
+    advance_cache_clock(monkeypatch, daikon_cache.DAIKON_CACHE_NEGATIVE_TTL + 1)
+    daikon_api.get_molecule_by_smiles("CXC")
+    daikon_api.get_molecule_by_smiles("CCO")
+
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 3
+
+
+def test_found_answers_expire_after_their_ttl(daikon_stub, monkeypatch):
+    daikon_api.get_molecule_by_smiles("CCO")
+    advance_cache_clock(
+        monkeypatch, daikon_cache.DAIKON_CACHE_TTLS["get_molecule_by_smiles"] + 1
+    )
+    daikon_api.get_molecule_by_smiles("CCO")
+
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 2
+
+
+def test_failed_requests_are_not_cached(daikon_stub):
+    daikon_stub.failures[MOLECULE_PATH] = [404]
+
+    assert daikon_api.get_molecule_by_smiles("CCO") is None
+    assert daikon_api.get_molecule_by_smiles("CCO")
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 2
+
+
+def test_cache_works_without_redis(daikon_stub):
+    # The autouse fixture points the cache at a closed port
+    assert daikon_api.get_horizon_associations("mol-1")
+    assert daikon_api.get_horizon_associations("mol-1")
+    assert daikon_stub.request_counts["/horizon/find-molecule-relations"] == 1
+
+
+def test_redis_shares_answers_between_processes(daikon_stub, monkeypatch):
+    client = redis.Redis.from_url(daikon_cache.DAIKON_CACHE_REDIS_URL)
+    try:
+        client.ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip("Redis is not available")
+    key = daikon_cache._cache_key("get_horizon_target", "mol-1-rel-0")
+    client.delete(key)
+    monkeypatch.setattr(daikon_cache, "_redis_client", client)
+    try:
+        first = daikon_api.get_horizon_target("mol-1-rel-0")
+        # Another process has an empty in-process cache
+        monkeypatch.setattr(daikon_cache, "_memory_cache", OrderedDict())
+        second = daikon_api.get_horizon_target("mol-1-rel-0")
+
+        assert first == second
+        assert daikon_stub.request_counts["/horizon/find-target"] == 1
+        assert 0 < client.ttl(key) <= daikon_cache.DAIKON_CACHE_TTLS["get_horizon_target"]
+    finally:
+        client.delete(key)
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("prometheus_client")
+pytest.importorskip("httpx")
+pytest.importorskip("redis")
+
+from app.hooks import registry  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_hooks(monkeypatch):
+    monkeypatch.setattr(registry, "pipeline_hooks", {})
+
+
+def test_has_async_hooks():
+    def sync_hook(document, results):
+        pass
+
+    async def async_hook(document, results):
+        pass
+
+    registry.register_hook("pipeline", sync_hook)
+    assert not registry.has_async_hooks()
+    registry.register_hook("pipeline", async_hook)
+    assert registry.has_async_hooks()
+
+
+def test_async_hooks_run_in_overlapping_threads():
+    # What the threads pool does when two documents finish together
+    calls = []
+    started = threading.Barrier(2)
+
+    async def a_hook(document, results):
+        await asyncio.sleep(0.05)
+        calls.append(("a", document))
+
+    async def b_hook(document, results):
+        calls.append(("b", document))
+
+    def c_hook(document, results):
+        calls.append(("c", document))
+
+    for hook in (a_hook, b_hook, c_hook):
+        registry.register_hook("pipeline", hook)
+
+    def run(document):
+        started.wait()
+        registry.execute_hooks("pipeline", document, [])
+
+    threads = [threading.Thread(target=run, args=(document,)) for document in ("one", "two")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(calls) == sorted(
+        (name, document) for name in "abc" for document in ("one", "two")
+    )
@@ -0,0 +1,177 @@
+from types import SimpleNamespace
+import asyncio
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("loguru")
+pytest.importorskip("prometheus_client")
+
+from app.utils import http_client  # noqa: E402
+
+MOLECULE_PATH = "/molecule/similar/"
+DOCUMENT_PATH = "/docu-store/parsed-docs"
+
+
+@pytest.fixture(autouse=True)
+def client_state(monkeypatch):
+    """Start every test with closed circuits and fast retries."""
+    monkeypatch.setattr(http_client, "_breakers", {})
+    monkeypatch.setattr(http_client, "HTTP_BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(http_client, "HTTP_MAX_RETRIES", 3)
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_THRESHOLD", 5)
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_RESET", 30.0)
+
+
+def fetch_molecule(stub):
+    return http_client.api_client(
+        stub.url, MOLECULE_PATH, params={"SMILES": "CCO", "Threshold": 1, "Limit": 1}
+    )
+
+
+def open_circuit(stub, monkeypatch):
+    """Open the stub's circuit with two failures and let the next request be the trial."""
+    monkeypatch.setattr(http_client, "HTTP_MAX_RETRIES", 0)
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_THRESHOLD", 2)
+    stub.failures[MOLECULE_PATH] = [503, 503]
+    fetch_molecule(stub)
+    fetch_molecule(stub)
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_RESET", 0.0)
+
+
+# Retries
+
+def test_idempotent_requests_are_retried_on_retryable_statuses(daikon_stub):
+    daikon_stub.failures[MOLECULE_PATH] = [503, 502]
+
+    assert fetch_molecule(daikon_stub)
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 3
+
+
+def test_retries_stop_after_max_retries(daikon_stub):
+    daikon_stub.failures[MOLECULE_PATH] = [503] * 10
+
+    assert fetch_molecule(daikon_stub) is None
+    assert daikon_stub.request_counts[MOLECULE_PATH] == http_client.HTTP_MAX_RETRIES + 1
+
+
+def test_client_errors_are_not_retried(daikon_stub):
+    daikon_stub.failures[MOLECULE_PATH] = [404]
+
+    assert fetch_molecule(daikon_stub) is None
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 1
+
+
+def test_idempotent_updates_are_retried(daikon_stub):
+    daikon_stub.failures[DOCUMENT_PATH] = [503]
+
+    assert http_client.api_client(
+        daikon_stub.url, DOCUMENT_PATH, method="PUT", data={"filePath": "/a.pdf"}
+    )
+    assert daikon_stub.request_counts[DOCUMENT_PATH] == 2
+
+
+def test_posts_are_not_retried(daikon_stub):
+    daikon_stub.failures[DOCUMENT_PATH] = [503]
+
+    assert http_client.api_client(
+        daikon_stub.url, DOCUMENT_PATH, method="POST", data={"filePath": "/a.pdf"}
+    ) is None
+    assert daikon_stub.request_counts[DOCUMENT_PATH] == 1
+
+
+# Circuit breaker
+
+def test_circuit_opens_after_consecutive_failures(daikon_stub, monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_MAX_RETRIES", 0)
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_THRESHOLD", 3)
+    daikon_stub.failures[MOLECULE_PATH] = [503] * 10
+
+    for _ in range(5):
+        assert fetch_molecule(daikon_stub) is None
+
+    # The last two calls failed fast without reaching the host
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 3
+
+
+def test_client_errors_do_not_open_the_circuit(daikon_stub, monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_THRESHOLD", 2)
+    daikon_stub.failures[MOLECULE_PATH] = [404] * 3
+
+    for _ in range(3):
+        assert fetch_molecule(daikon_stub) is None
+    assert fetch_molecule(daikon_stub)
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 4
+
+
+def test_circuit_closes_after_a_successful_trial(daikon_stub, monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_MAX_RETRIES", 0)
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_THRESHOLD", 2)
+    daikon_stub.failures[MOLECULE_PATH] = [503, 503]
+    fetch_molecule(daikon_stub)
+    fetch_molecule(daikon_stub)
+    assert fetch_molecule(daikon_stub) is None
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 2
+
+    # Once the reset time has passed, one trial request is let through
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_RESET", 0.0)
+    assert fetch_molecule(daikon_stub)
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_RESET", 30.0)
+    assert fetch_molecule(daikon_stub)
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 4
+
+
+def test_a_failed_trial_reopens_the_circuit(daikon_stub, monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_MAX_RETRIES", 0)
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_THRESHOLD", 2)
+    daikon_stub.failures[MOLECULE_PATH] = [503] * 3
+    fetch_molecule(daikon_stub)
+    fetch_molecule(daikon_stub)
+
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_RESET", 0.0)
+    assert fetch_molecule(daikon_stub) is None
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_RESET", 30.0)
+    assert fetch_molecule(daikon_stub) is None
+    assert daikon_stub.request_counts[MOLECULE_PATH] == 3
+
+
+def test_an_interrupted_trial_is_released(daikon_stub, monkeypatch):
+    open_circuit(daikon_stub, monkeypatch)
+
+    def interrupted_request(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            http_client,
+            "_get_session",
+            lambda base_url: SimpleNamespace(request=interrupted_request),
+        )
+        with pytest.raises(KeyboardInterrupt):
+            fetch_molecule(daikon_stub)
+
+    # The next request is let through as the trial and closes the circuit
+    assert fetch_molecule(daikon_stub)
+    monkeypatch.setattr(http_client, "HTTP_BREAKER_RESET", 30.0)
+    assert fetch_molecule(daikon_stub)
+
+
+def test_a_cancelled_async_trial_is_released(daikon_stub, monkeypatch):
+    pytest.importorskip("httpx")
+    from app.utils import http_client_async
+
+    open_circuit(daikon_stub, monkeypatch)
+    monkeypatch.setattr(daikon_stub.DaikonStubHandler, "latency", 1.0)
+
+    async def cancelled_trial():
+        try:
+            await asyncio.wait_for(
+                http_client_async.api_client(daikon_stub.url, MOLECULE_PATH), 0.1
+            )
+        finally:
+            await http_client_async.close_clients()
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(cancelled_trial())
+
+    host = daikon_stub.url.split("://", 1)[1]
+    assert not http_client.get_breaker(host).trial_in_flight
@@ -0,0 +1,52 @@
+import os
+import time
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("loguru")
+
+from app.service.doc_loader import page_cache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_ENABLED", True)
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_DIR", tmp_path)
+    return tmp_path
+
+
+def test_stored_pages_are_loaded_back():
+    image = np.arange(12, dtype=np.uint8).reshape(2, 2, 3)
+    page_cache.store_page("doc", 1, 150, image)
+
+    assert np.array_equal(page_cache.load_page("doc", 1, 150), image)
+    assert page_cache.load_page("doc", 2, 150) is None
+
+
+def test_least_recently_used_pages_are_evicted_first(cache_dir):
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    for page in (1, 2, 3):
+        page_cache.store_page("doc", page, 150, image)
+        path = cache_dir / "doc" / f"{page}_150.npy"
+        os.utime(path, (time.time() - 100 + page, time.time() - 100 + page))
+    page_size = (cache_dir / "doc" / "1_150.npy").stat().st_size
+
+    assert page_cache.evict_pages(max_bytes=2 * page_size) == 1
+    assert page_cache.load_page("doc", 1, 150) is None
+    assert page_cache.load_page("doc", 3, 150) is not None
+
+
+def test_stale_temporary_files_are_removed(cache_dir):
+    (cache_dir / "killed").mkdir()
+    stale = cache_dir / "killed" / "abc.tmp"
+    stale.write_bytes(b"partial")
+    old = time.time() - page_cache.PAGE_CACHE_TMP_MAX_AGE - 1
+    os.utime(stale, (old, old))
+    (cache_dir / "writing").mkdir()
+    fresh = cache_dir / "writing" / "def.tmp"
+    fresh.write_bytes(b"partial")
+
+    page_cache.evict_pages()
+
+    assert not stale.exists() and not (cache_dir / "killed").exists()
+    assert fresh.exists()
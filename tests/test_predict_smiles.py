@@ -0,0 +1,34 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("DECIMER")
+Chem = pytest.importorskip("rdkit.Chem")
+Draw = pytest.importorskip("rdkit.Chem.Draw")
+
+from app.service.prediction import predict_smiles  # noqa: E402
+
+MOLECULES = [
+    "CC(=O)OC1=CC=CC=C1C(=O)O",
+    "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+    "CC(C)CC1=CC=C(C=C1)C(C)C(=O)O",
+]
+
+
+def render_segment(smiles: str) -> np.ndarray:
+    """Draw a molecule as a BGR segment, like the segmentation step returns."""
+    image = Draw.MolToImage(Chem.MolFromSmiles(smiles), size=(400, 300))
+    return np.asarray(image.convert("RGB"))[:, :, ::-1].copy()
+
+
+def test_predictions_match_single_segment_prediction():
+    segments = [render_segment(smiles) for smiles in MOLECULES]
+    progress = []
+
+    predictions = predict_smiles.predict_smiles_from_segments(
+        segments, use_cache=False, on_progress=lambda done, total: progress.append(done)
+    )
+    single = [predict_smiles.predict_smiles_from_segment(segment) for segment in segments]
+
+    assert predictions == single
+    assert all(prediction is not None for prediction in predictions)
+    assert progress == list(range(len(segments) + 1))
@@ -0,0 +1,68 @@
+import os
+import uuid
+import pytest
+
+redis = pytest.importorskip("redis")
+pytest.importorskip("celery")
+pytest.importorskip("loguru")
+
+
+@pytest.fixture
+def run_lease():
+    """The lease module, against the broker's Redis, with a fresh document id."""
+    broker = os.getenv("REDIS_BROKER_URL", "redis://localhost:6379/0")
+    try:
+        redis.Redis.from_url(broker).ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip("Redis is not available")
+    from app.utils import run_lease
+
+    document_id = uuid.uuid4()
+    yield run_lease, document_id
+    run_lease.redis_connection.delete(run_lease._lease_key(document_id, 0))
+
+
+def test_exclusive_lease_excludes_other_tasks(run_lease):
+    lease, document_id = run_lease
+
+    assert lease.acquire_run_lease(document_id, 0, "task-a", exclusive=True) is None
+    assert lease.acquire_run_lease(document_id, 0, "task-b", exclusive=True) == "task-a"
+    assert lease.acquire_run_lease(document_id, 0, "task-c") == "task-a"
+
+    lease.release_run_lease(document_id, 0, "task-a")
+    assert lease.acquire_run_lease(document_id, 0, "task-b", exclusive=True) is None
+    lease.release_run_lease(document_id, 0, "task-b")
+
+
+def test_redelivered_copy_of_a_running_task_is_refused(run_lease):
+    lease, document_id = run_lease
+
+    assert lease.acquire_run_lease(document_id, 0, "task-a") is None
+    # A second delivery has the same task id but is another execution
+    assert lease.acquire_run_lease(document_id, 0, "task-a") == "task-a"
+    lease.release_run_lease(document_id, 0, "task-a")
+
+
+def test_subtasks_share_a_handed_over_run(run_lease):
+    lease, document_id = run_lease
+
+    assert lease.acquire_run_lease(document_id, 0, "parent", exclusive=True) is None
+    lease.release_run_lease(document_id, 0, "parent", hand_over=True)
+
+    assert lease.acquire_run_lease(document_id, 0, "pages-1") is None
+    assert lease.acquire_run_lease(document_id, 0, "pages-2") is None
+    # Resuming the run waits for the parent's lease to expire and the subtasks to finish
+    assert lease.acquire_run_lease(document_id, 0, "resume", exclusive=True) is not None
+    lease.release_run_lease(document_id, 0, "pages-1")
+    lease.release_run_lease(document_id, 0, "pages-2")
+
+
+def test_expired_leases_are_taken_over(run_lease):
+    lease, document_id = run_lease
+    # What a worker that crashed long ago leaves behind
+    lease.redis_connection.hset(
+        lease._lease_key(document_id, 0), "crashed", "token 1 exclusive"
+    )
+
+    assert lease.acquire_run_lease(document_id, 0, "resume", exclusive=True) is None
+    lease.release_run_lease(document_id, 0, "resume")
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+import pytest
+
+pytest.importorskip("celery")
+pytest.importorskip("tensorflow")
+redis = pytest.importorskip("redis")
+
+# Import the prediction worker's app and its tasks the way a prefork parent
+# does, and list the model modules that got imported
+PARENT_IMPORTS = """
+import sys
+from app.core.celery_config import celery_app
+celery_app.loader.import_default_modules()
+import app.pipeline.smiles_prediction
+print("model modules:", [
+    name for name in ("tensorflow", "DECIMER", "decimer_segmentation") if name in sys.modules
+])
+"""
+
+
+def test_prefork_parent_does_not_import_the_models():
+    broker = os.getenv("REDIS_BROKER_URL", "redis://localhost:6379/0")
+    try:
+        redis.Redis.from_url(broker).ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip("Redis is not available")
+
+    completed = subprocess.run(
+        [sys.executable, "-c", PARENT_IMPORTS], capture_output=True, text=True, check=True
+    )
+
+    assert "model modules: []" in completed.stdout.splitlines()